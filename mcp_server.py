@@ -1,257 +1,2463 @@
+import asyncio
+import base64
+import functools
+import importlib
+import inspect
+import json
 import os
+import random
+import re
+import sqlite3
+import ssl
+import sys
+import threading
+import time
+from contextlib import aclosing, asynccontextmanager, contextmanager
+from contextvars import ContextVar, copy_context
+from email.utils import parsedate_to_datetime
 from typing import Any
-from collections import defaultdict
+from collections import Counter, OrderedDict, defaultdict
+from urllib.parse import urlencode, urlsplit
+
+import httpx
+from mcp.server.fastmcp import Context, FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+try:
+    from cryptography import x509
+except ImportError:  # certificate expiry is reported only when available
+    x509 = None
+
+# Red Hat internal groups API base URL; a plain-HTTP URL (e.g. the local mock
+# in scripts/mock_groups_api.py) is used without the client certificate
+API_BASE_URL = os.environ.get("API_BASE_URL", "https://internal-groups.iam.redhat.com/v1")
+
+# Certificate paths
+CERT_FILE = os.environ.get("CERT_FILE", "sa-cert.crt")
+KEY_FILE = os.environ.get("KEY_FILE", "privkey.pem")
+
+# Seconds between checks of the certificate files for rotation, and how long
+# the previous client is kept open for in-flight requests after a reload
+CERT_RELOAD_INTERVAL = float(os.environ.get("CERT_RELOAD_INTERVAL", "60"))
+CERT_RELOAD_GRACE = float(os.environ.get("CERT_RELOAD_GRACE", "30"))
+
+# Connection pool settings for the shared HTTP client
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_MAX_CONCURRENCY_PER_HOST = int(os.environ.get("HTTP_MAX_CONCURRENCY_PER_HOST", "20"))
+
+# Maximum number of groups the fan-out tools analyze at the same time
+ANALYSIS_CONCURRENCY = int(os.environ.get("ANALYSIS_CONCURRENCY", "10"))
+
+# Page size used when walking the whole /groups listing
+GROUPS_PAGE_SIZE = int(os.environ.get("GROUPS_PAGE_SIZE", "100"))
+
+# Groups the group-walking analytical tools process when the caller does not
+# pass max_groups; walking the whole inventory needs an explicit max_groups=0
+ANALYSIS_MAX_GROUPS = int(os.environ.get("ANALYSIS_MAX_GROUPS", "200"))
+
+# Seconds a single member's JIRA search may take before that member is
+# skipped. Backends that answer a whole batch in one query (fixture, the http
+# batch endpoint) are bounded by their own request timeout instead.
+MEMBER_ANALYSIS_TIMEOUT = float(os.environ.get("MEMBER_ANALYSIS_TIMEOUT", "30"))
+
+# Local group snapshot: a SQLite index of groups, owners and members kept up
+# to date by a background sync. Disabled unless SNAPSHOT_DB is set.
+SNAPSHOT_DB = os.environ.get("SNAPSHOT_DB", "")
+SNAPSHOT_SYNC_INTERVAL = float(os.environ.get("SNAPSHOT_SYNC_INTERVAL", "900"))
+SNAPSHOT_MAX_AGE = float(os.environ.get("SNAPSHOT_MAX_AGE", "3600"))
+
+# Timeouts. HTTP_TIMEOUT bounds each upstream request; TOOL_DEADLINE bounds a
+# whole tool call including every nested request (0 disables). Aggregate
+# tools return partial results once the deadline passes; a tool still running
+# TOOL_DEADLINE_GRACE seconds later is abandoned.
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "10"))
+TOOL_DEADLINE = float(os.environ.get("TOOL_DEADLINE", "120"))
+TOOL_DEADLINE_GRACE = float(os.environ.get("TOOL_DEADLINE_GRACE", "5"))
+
+# Minimum seconds between routine progress notifications; findings are
+# always sent immediately.
+PROGRESS_INTERVAL = float(os.environ.get("PROGRESS_INTERVAL", "0.25"))
+
+# Retry policy for transient upstream failures. Only idempotent methods are
+# retried; each tool call may spend at most RETRY_BUDGET_PER_TOOL retries.
+RETRY_MAX_ATTEMPTS = int(os.environ.get("RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BACKOFF_BASE = float(os.environ.get("RETRY_BACKOFF_BASE", "0.5"))
+RETRY_BACKOFF_MAX = float(os.environ.get("RETRY_BACKOFF_MAX", "10"))
+RETRY_BUDGET_PER_TOOL = int(os.environ.get("RETRY_BUDGET_PER_TOOL", "20"))
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+RETRY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Client-side rate limits for the groups API. RATE_LIMIT_ENDPOINTS adds
+# per-prefix buckets, e.g. "/users=5,/groups=40:80" (rate[:burst]).
+# A 429 cuts the rate by RATE_LIMIT_DECREASE; it then recovers by
+# RATE_LIMIT_RECOVERY of the configured rate per second.
+RATE_LIMIT_RPS = float(os.environ.get("RATE_LIMIT_RPS", "50"))
+RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", "0")) or RATE_LIMIT_RPS
+RATE_LIMIT_ENDPOINTS = os.environ.get("RATE_LIMIT_ENDPOINTS", "")
+RATE_LIMIT_MIN_RPS = float(os.environ.get("RATE_LIMIT_MIN_RPS", "1"))
+RATE_LIMIT_DECREASE = float(os.environ.get("RATE_LIMIT_DECREASE", "0.5"))
+RATE_LIMIT_RECOVERY = float(os.environ.get("RATE_LIMIT_RECOVERY", "0.05"))
+
+# Circuit breakers: after BREAKER_FAILURE_THRESHOLD consecutive failures a
+# backend is skipped for BREAKER_RESET_TIMEOUT seconds, then probed once.
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.environ.get("BREAKER_RESET_TIMEOUT", "30"))
+
+# Response cache settings. TTLs are per endpoint family; 404s are cached
+# for CACHE_NEGATIVE_TTL so repeated lookups of missing groups stay cheap.
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "1000"))
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL_GROUPS = float(os.environ.get("CACHE_TTL_GROUPS", "300"))
+CACHE_TTL_USERS = float(os.environ.get("CACHE_TTL_USERS", "900"))
+CACHE_NEGATIVE_TTL = float(os.environ.get("CACHE_NEGATIVE_TTL", "60"))
+
+# Tracing. Finished spans of the last TRACE_BUFFER_SIZE traces are kept in
+# memory for trace_waterfall (0 keeps none), at most TRACE_MAX_SPANS across
+# all of them; older traces are evicted first. With TRACE_FILE set, every
+# span is also appended to it as a JSON line using OTLP field names. Tracing
+# is off when neither is enabled.
+TRACE_BUFFER_SIZE = int(os.environ.get("TRACE_BUFFER_SIZE", "20"))
+TRACE_MAX_SPANS = int(os.environ.get("TRACE_MAX_SPANS", "5000"))
+TRACE_FILE = os.environ.get("TRACE_FILE", "")
+
+# Path of the Prometheus metrics endpoint in the HTTP transports
+METRICS_PATH = os.environ.get("METRICS_PATH", "/metrics")
+# Histogram buckets for latencies (seconds) and per-tool fan-out (calls)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+FANOUT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class ClientCertificate:
+    """
+    Client certificate and key loaded once into a reusable SSL context.
+
+    Loading validates that the key matches the certificate. `changed()`
+    compares the files' modification times and sizes with the loaded copy so
+    rotated secrets can be picked up without a restart.
+    """
+
+    def __init__(self, cert_file: str, key_file: str):
+        self.cert_file = cert_file
+        self.key_file = key_file
+        self.context: ssl.SSLContext | None = None
+        self.loaded_at: float | None = None
+        self.not_after: float | None = None
+        self.subject: str | None = None
+        self.reloads = 0
+        self.last_error: str | None = None
+        self._signature = None
+
+    def _file_signature(self) -> tuple:
+        signature = []
+        for path in (self.cert_file, self.key_file):
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def load(self) -> ssl.SSLContext:
+        """Build a fresh SSL context from the files; blocking, so run it in a thread."""
+        if not os.path.exists(self.cert_file):
+            raise FileNotFoundError(f"Certificate file not found: {self.cert_file}")
+        if not os.path.exists(self.key_file):
+            raise FileNotFoundError(f"Private key file not found: {self.key_file}")
+
+        signature = self._file_signature()
+        context = ssl.create_default_context()
+        # Server certificates of the internal APIs are not verified
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        context.load_cert_chain(self.cert_file, self.key_file)
+
+        not_after = subject = None
+        if x509 is not None:
+            with open(self.cert_file, "rb") as f:
+                certificate = x509.load_pem_x509_certificate(f.read())
+            not_after = certificate.not_valid_after_utc.timestamp()
+            subject = certificate.subject.rfc4514_string()
+
+        if self.context is not None:
+            self.reloads += 1
+        self.context = context
+        self.loaded_at = time.time()
+        self.not_after = not_after
+        self.subject = subject
+        self.last_error = None
+        self._signature = signature
+        return context
+
+    def changed(self) -> bool:
+        """Whether the files on disk differ from the loaded certificate."""
+        try:
+            return self._file_signature() != self._signature
+        except OSError:
+            # Mid-rotation the files can briefly be missing; keep the old one
+            return False
+
+    def status(self) -> dict[str, Any]:
+        status = {
+            "cert_file": self.cert_file,
+            "key_file": self.key_file,
+            "loaded": self.context is not None,
+            "loaded_at": _iso_timestamp(self.loaded_at),
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
+        if x509 is None:
+            status["expiry"] = "unknown (install cryptography to report it)"
+        elif self.not_after is not None:
+            status["subject"] = self.subject
+            status["not_after"] = _iso_timestamp(self.not_after)
+            status["days_until_expiry"] = round((self.not_after - time.time()) / 86400, 1)
+        return status
+
+
+def _iso_timestamp(timestamp: float | None) -> str | None:
+    """Format a Unix timestamp as UTC ISO 8601."""
+    if timestamp is None:
+        return None
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+# Process-wide client state. The client is bound to the event loop that
+# created it, so scripts that call asyncio.run() repeatedly get a fresh one.
+_http_client: httpx.AsyncClient | None = None
+_http_client_loop: asyncio.AbstractEventLoop | None = None
+_host_semaphores: dict[str, asyncio.Semaphore] = {}
+_client_certificate = ClientCertificate(CERT_FILE, KEY_FILE)
+_retiring_clients: set[asyncio.Task] = set()
+
+
+def _uses_client_certificate() -> bool:
+    """Plain-HTTP base URLs (e.g. a local mock API) need no client certificate."""
+    return not API_BASE_URL.startswith("http://")
+
+
+def _new_http_client(context: ssl.SSLContext | None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        verify=context if context is not None else True,
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """Return the shared authenticated HTTP client, creating it on first use."""
+    global _http_client, _http_client_loop
+
+    loop = asyncio.get_running_loop()
+    if _http_client is not None and not _http_client.is_closed and _http_client_loop is loop:
+        return _http_client
+
+    with trace_span("http_client.open"):
+        context = None
+        if _uses_client_certificate():
+            context = _client_certificate.context
+            if context is None:
+                context = await asyncio.to_thread(_client_certificate.load)
+        # Another caller may have created the client while the certificate loaded
+        if _http_client is not None and not _http_client.is_closed and _http_client_loop is loop:
+            return _http_client
+
+        _http_client = _new_http_client(context)
+        _http_client_loop = loop
+        _host_semaphores.clear()
+        return _http_client
+
+
+async def reload_client_certificate() -> bool:
+    """
+    Swap in a new client when the certificate files changed on disk.
+
+    New requests use the new client immediately; the previous one is closed
+    after CERT_RELOAD_GRACE seconds so in-flight requests can finish. A
+    certificate that fails to load (e.g. a half-written rotation) leaves the
+    current client in place and is retried on the next check.
+    """
+    global _http_client
+
+    if not _uses_client_certificate() or _client_certificate.context is None:
+        return False
+    if not await asyncio.to_thread(_client_certificate.changed):
+        return False
+    try:
+        context = await asyncio.to_thread(_client_certificate.load)
+    except (OSError, ValueError) as e:
+        # ssl.SSLError is an OSError; ValueError covers an unparsable PEM
+        _client_certificate.last_error = str(e)
+        return False
+
+    old_client = _http_client
+    if old_client is not None and _http_client_loop is asyncio.get_running_loop():
+        _http_client = _new_http_client(context)
+        task = asyncio.create_task(_close_client_later(old_client, CERT_RELOAD_GRACE))
+        _retiring_clients.add(task)
+        task.add_done_callback(_retiring_clients.discard)
+    return True
+
+
+async def _close_client_later(client: httpx.AsyncClient, delay: float) -> None:
+    try:
+        await asyncio.sleep(delay)
+    finally:
+        await client.aclose()
+
+
+async def certificate_reload_loop() -> None:
+    """Background job checking for rotated certificates every CERT_RELOAD_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(CERT_RELOAD_INTERVAL)
+        try:
+            if await reload_client_certificate():
+                print(f"Reloaded client certificate from {CERT_FILE}", file=sys.stderr)
+        except Exception as e:
+            print(f"Certificate reload failed: {e}", file=sys.stderr)
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and release its pooled connections."""
+    global _http_client, _http_client_loop
+
+    client, _http_client, _http_client_loop = _http_client, None, None
+    _host_semaphores.clear()
+    for task in list(_retiring_clients):
+        task.cancel()
+    await asyncio.gather(*_retiring_clients, return_exceptions=True)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    """Get the semaphore limiting concurrent requests to the URL's host."""
+    host = urlsplit(url).netloc
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(HTTP_MAX_CONCURRENCY_PER_HOST)
+    return _host_semaphores[host]
+
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP):
+    """Open the shared HTTP client and start background jobs; stop them on shutdown."""
+    try:
+        await get_http_client()
+    except (FileNotFoundError, ssl.SSLError) as e:
+        # Tools report certificate problems per call, so keep serving
+        _client_certificate.last_error = str(e)
+        print(f"Warning: {e}", file=sys.stderr)
+    background_tasks = [asyncio.create_task(certificate_reload_loop())]
+    if get_snapshot_store() is not None:
+        background_tasks.append(asyncio.create_task(snapshot_sync_loop(get_snapshot_store())))
+    try:
+        yield {}
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        await close_http_client()
+        if _jira_backend is not None:
+            await _jira_backend.close()
+        if _snapshot_store is not None:
+            _snapshot_store.close()
+        for exporter in _span_exporters:
+            exporter.close()
+
+
+mcp = FastMCP("rover", lifespan=server_lifespan)
+
+
+class Metric:
+    """One metric family: a name, help text and values keyed by label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values: dict[tuple, Any] = {}
+
+    def _key(self, labels: dict[str, Any]) -> tuple:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def _labels(self, key: tuple) -> dict[str, str]:
+        return dict(zip(self.labels, key))
+
+    def samples(self):
+        """Yield (suffix, labels, value) for the exposition format."""
+        for key, value in sorted(self._values.items()):
+            yield "", self._labels(key), value
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [{"labels": self._labels(key), "value": value} for key, value in sorted(self._values.items())]
+
+
+class MetricCounter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class MetricGauge(Metric):
+    """Gauge set directly, moved up and down, or read from a function when collected."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labels)
+        self._functions: dict[tuple, Any] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn, **labels) -> None:
+        self._functions[self._key(labels)] = fn
+
+    @contextmanager
+    def track(self, **labels):
+        """Count the enclosed block as in flight."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _collect(self) -> dict[tuple, float]:
+        values = dict(self._values)
+        for key, fn in self._functions.items():
+            values[key] = fn()
+        return values
+
+    def samples(self):
+        for key, value in sorted(self._collect().items()):
+            yield "", self._labels(key), value
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [{"labels": self._labels(key), "value": value} for key, value in sorted(self._collect().items())]
+
+
+class MetricHistogram(Metric):
+    """Cumulative-bucket histogram; values are [bucket counts, sum, count] per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[0][position] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def samples(self):
+        for key, (counts, total, count) in sorted(self._values.items()):
+            labels = self._labels(key)
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield "_bucket", {**labels, "le": _format_metric_value(bound)}, bucket_count
+            yield "_bucket", {**labels, "le": "+Inf"}, count
+            yield "_sum", labels, total
+            yield "_count", labels, count
+
+    def quantile(self, q: float, counts: list[int], count: int) -> float | None:
+        """Estimate a quantile by interpolating within its bucket, as Prometheus does."""
+        if not count:
+            return None
+        rank = q * count
+        lower, below = 0.0, 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            if bucket_count >= rank:
+                share = (rank - below) / (bucket_count - below) if bucket_count > below else 1.0
+                return lower + (bound - lower) * share
+            lower, below = bound, bucket_count
+        return self.buckets[-1]
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        summaries = []
+        for key, (counts, total, count) in sorted(self._values.items()):
+            summary = {"labels": self._labels(key), "count": count, "sum": round(total, 6)}
+            summary["avg"] = round(total / count, 6)
+            for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+                summary[name] = round(self.quantile(q, counts, count), 6)
+            summaries.append(summary)
+        return summaries
+
+
+def _format_metric_value(value: float) -> str:
+    if isinstance(value, float):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(value) if not value.is_integer() else str(int(value))
+    return str(value)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """Named metrics rendered in the Prometheus text format or as a dict for the server_metrics tool."""
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> MetricCounter:
+        return self._register(MetricCounter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> MetricGauge:
+        return self._register(MetricGauge(name, help_text, labels))
+
+    def histogram(
+        self, name: str, help_text: str, labels: tuple[str, ...] = (), buckets=LATENCY_BUCKETS
+    ) -> MetricHistogram:
+        return self._register(MetricHistogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                label_text = ",".join(f'{name}="{_escape_label_value(str(v))}"' for name, v in labels.items())
+                series = f"{metric.name}{suffix}{{{label_text}}}" if label_text else f"{metric.name}{suffix}"
+                lines.append(f"{series} {_format_metric_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self, prefix: str = "") -> dict[str, Any]:
+        return {
+            name: {"type": metric.kind, "help": metric.help, "values": metric.snapshot()}
+            for name, metric in self._metrics.items()
+            if name.startswith(prefix)
+        }
+
+
+METRICS = MetricsRegistry()
+_metrics_started = time.time()
+
+TOOL_CALLS = METRICS.counter(
+    "rover_tool_calls_total", "Tool calls by outcome (ok, error, incomplete, exception, cancelled)", ("tool", "outcome")
+)
+TOOL_DURATION = METRICS.histogram("rover_tool_duration_seconds", "Tool call latency", ("tool",))
+TOOLS_IN_FLIGHT = METRICS.gauge("rover_tools_in_flight", "Tool calls currently running", ("tool",))
+# How a groups API request was answered; "upstream" alone reached the API
+REQUEST_SOURCES = ("upstream", "cache", "coalesced", "stale", "error")
+
+TOOL_FANOUT = METRICS.histogram(
+    "rover_tool_fanout",
+    "Calls made by one tool call: groups API requests by how they were answered, and JIRA searches",
+    ("tool", "kind"),
+    FANOUT_BUCKETS,
+)
+REQUESTS = METRICS.counter(
+    "rover_requests_total",
+    "Groups API requests by how they were answered (cache, upstream, coalesced, stale, error)",
+    ("endpoint", "source"),
+)
+REQUEST_DURATION = METRICS.histogram(
+    "rover_request_duration_seconds", "Groups API request latency as seen by the caller", ("endpoint", "source")
+)
+REQUEST_ERRORS = METRICS.counter(
+    "rover_request_errors_total", "Failed groups API requests by HTTP status or error type", ("endpoint", "status")
+)
+REQUESTS_IN_FLIGHT = METRICS.gauge("rover_requests_in_flight", "Groups API requests awaiting an answer", ("endpoint",))
+UPSTREAM_RESPONSES = METRICS.counter(
+    "rover_upstream_responses_total",
+    "HTTP attempts sent upstream, retries included, by status or transport error",
+    ("endpoint", "status"),
+)
+UPSTREAM_DURATION = METRICS.histogram(
+    "rover_upstream_attempt_duration_seconds", "Latency of single HTTP attempts", ("endpoint",)
+)
+UPSTREAM_IN_FLIGHT = METRICS.gauge("rover_upstream_in_flight", "HTTP attempts on the wire", ("endpoint",))
+JIRA_SEARCHES = METRICS.counter(
+    "rover_jira_searches_total", "JIRA searches by kind (single, batch) and outcome", ("backend", "kind", "outcome")
+)
+JIRA_DURATION = METRICS.histogram(
+    "rover_jira_search_duration_seconds", "JIRA search latency", ("backend", "kind")
+)
+JIRA_IN_FLIGHT = METRICS.gauge("rover_jira_searches_in_flight", "JIRA searches currently running", ("backend",))
+
+
+def _endpoint_label(url: str) -> str:
+    """Reduce a URL to a low-cardinality label: the groups API path template, or the host elsewhere."""
+    if not url.startswith(API_BASE_URL):
+        return urlsplit(url).netloc
+    parts = url[len(API_BASE_URL):].split("?", 1)[0].strip("/").split("/")
+    if len(parts) >= 2 and parts[:2] != ["groups", "validate"]:
+        parts[1] = "{cn}" if parts[0] == "groups" else "{uid}"
+    return "/" + "/".join(parts)
+
+
+def _error_status(error: BaseException) -> str:
+    """Label an error by HTTP status, or by kind for failures without one."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return str(error.response.status_code)
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, DeadlineExceeded):
+        return "deadline"
+    if isinstance(error, asyncio.CancelledError):
+        return "cancelled"
+    return type(error).__name__
+
+
+class Span:
+    """
+    One timed operation in a trace.
+
+    Ids have the W3C trace-context sizes used by OpenTelemetry (16-byte
+    trace id, 8-byte span id) and spans export with OTLP field names, so
+    traces can be loaded by OpenTelemetry tooling.
+    """
+
+    def __init__(self, name: str, parent: "Span | None", kind: str = "INTERNAL", attributes: dict | None = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.status = "UNSET"
+        self.status_message = ""
+        self.events: list[dict[str, Any]] = []
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str, message: str = "") -> None:
+        self.status = status
+        self.status_message = message
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status = "ERROR"
+        self.status_message = str(error) or type(error).__name__
+        self.events.append({
+            "name": "exception",
+            "timeUnixNano": time.time_ns(),
+            "attributes": {"exception.type": type(error).__name__, "exception.message": str(error)},
+        })
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self) -> dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind}",
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "events": self.events,
+            "status": {"code": f"STATUS_CODE_{self.status}", "message": self.status_message},
+        }
+
+
+class _NullSpan:
+    """Stands in for a span while tracing is off."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, status: str, message: str = "") -> None:
+        pass
+
+    def record_exception(self, error: BaseException) -> None:
+        pass
+
+
+class InMemorySpanExporter:
+    """
+    Keep the finished spans of the most recent traces.
+
+    At most `max_traces` traces and `max_spans` spans in total are kept; the
+    oldest traces are evicted first. A single trace larger than `max_spans`
+    keeps its first spans and its root and counts the rest as dropped.
+    """
+
+    def __init__(self, max_traces: int, max_spans: int):
+        self.max_traces = max_traces
+        self.max_spans = max_spans
+        self._traces: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._span_count = 0
+
+    def export(self, span: Span) -> None:
+        trace = self._traces.get(span.trace_id)
+        if trace is None:
+            trace = self._traces[span.trace_id] = {"spans": [], "dropped_spans": 0}
+            while len(self._traces) > self.max_traces:
+                self._evict_oldest(span.trace_id)
+        # The root ends last and is needed to show the trace, so it is always kept
+        if span.parent_id is not None and len(trace["spans"]) >= self.max_spans:
+            trace["dropped_spans"] += 1
+            return
+        trace["spans"].append(span)
+        self._span_count += 1
+        while self._span_count > self.max_spans and len(self._traces) > 1:
+            self._evict_oldest(span.trace_id)
+
+    def _evict_oldest(self, keep: str) -> None:
+        oldest = next(trace_id for trace_id in self._traces if trace_id != keep)
+        self._span_count -= len(self._traces.pop(oldest)["spans"])
+
+    def get(self, trace_id: str) -> dict[str, Any] | None:
+        return self._traces.get(trace_id)
+
+    def traces(self) -> list[tuple[str, dict[str, Any]]]:
+        return list(self._traces.items())
+
+    def close(self) -> None:
+        pass
+
+
+class JsonLinesSpanExporter:
+    """Append finished spans to a JSON Lines file, flushing when a trace's root span ends."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def export(self, span: Span) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(span.to_otlp(), default=str) + "\n")
+        if span.parent_id is None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+_trace_buffer = InMemorySpanExporter(TRACE_BUFFER_SIZE, TRACE_MAX_SPANS) if TRACE_BUFFER_SIZE > 0 else None
+_span_exporters = [_trace_buffer] if _trace_buffer is not None else []
+if TRACE_FILE:
+    _span_exporters.append(JsonLinesSpanExporter(TRACE_FILE))
+
+# The span new spans are parented to; tasks inherit it when they are created
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def trace_span(name: str, kind: str = "INTERNAL", **attributes):
+    """
+    Time the enclosed block as a child of the current span (or a new trace).
+
+    Exceptions mark the span as failed; cancellation is recorded as an
+    attribute. Spans are exported when they end.
+    """
+    if not _span_exporters:
+        yield _NullSpan()
+        return
+    span = Span(name, _current_span.get(), kind, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except asyncio.CancelledError:
+        span.set_attribute("cancelled", True)
+        raise
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+        for exporter in _span_exporters:
+            exporter.export(span)
+
+
+def traced(fn):
+    """Run an async helper inside a span named after it."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        with trace_span(fn.__name__):
+            return await fn(*args, **kwargs)
+    return wrapper
+
+
+@mcp.custom_route(METRICS_PATH, methods=["GET"])
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Serve the metrics in the Prometheus text format."""
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class ToolScope:
+    """Deadline, retry budget and per-call counters shared by one tool call and the tools it calls."""
+
+    def __init__(self, retry_budget: int, deadline_seconds: float = 0):
+        self.deadline_seconds = deadline_seconds
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds > 0 else None
+        self.deadline_hits = 0
+        self.retry_budget = retry_budget
+        self.retries = 0
+        self.retries_exhausted = 0
+        self.retries_by_reason: dict[str, int] = defaultdict(int)
+        self.stale_responses = 0
+        # Fan-out counts reported to the metrics, not in _meta: groups API
+        # requests by how they were answered (see REQUEST_SOURCES) and JIRA searches
+        self.requests_by_source: dict[str, int] = defaultdict(int)
+        self.jira_searches = 0
+
+    def take_retry(self, reason: str) -> bool:
+        """Spend one retry from the budget, or record that none was left."""
+        if self.retry_budget <= 0:
+            self.retries_exhausted += 1
+            return False
+        self.retry_budget -= 1
+        self.retries += 1
+        self.retries_by_reason[reason] += 1
+        return True
+
+    def shared_request_scope(self) -> "ToolScope":
+        """Scope for a request other calls may join: this call's remaining retries, no deadline."""
+        return ToolScope(self.retry_budget)
+
+    def absorb_retries(self, other: "ToolScope") -> None:
+        """Charge the retries spent under `other` to this call."""
+        self.retry_budget = max(0, self.retry_budget - other.retries)
+        self.retries += other.retries
+        self.retries_exhausted += other.retries_exhausted
+        for reason, count in other.retries_by_reason.items():
+            self.retries_by_reason[reason] += count
+
+    def meta(self) -> dict[str, Any]:
+        """Return the counters worth reporting, or an empty dict."""
+        meta = {}
+        if self.retries or self.retries_exhausted:
+            meta["retries"] = {
+                "count": self.retries,
+                "by_reason": dict(self.retries_by_reason),
+                "budget_exhausted": self.retries_exhausted > 0,
+            }
+        if self.stale_responses:
+            meta["stale_responses"] = self.stale_responses
+        if self.deadline_hits:
+            meta["deadline"] = {"seconds": self.deadline_seconds, "cut_short_calls": self.deadline_hits}
+        return meta
+
+
+_tool_scope: ContextVar[ToolScope | None] = ContextVar("tool_scope", default=None)
+_retry_stats: dict[str, int] = defaultdict(int)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call would run past the current tool's deadline."""
+
+
+def remaining_time() -> float | None:
+    """Seconds left before the current tool's deadline, or None without one."""
+    scope = _tool_scope.get()
+    if scope is None or scope.deadline is None:
+        return None
+    return scope.deadline - time.monotonic()
+
+
+def deadline_exceeded() -> bool:
+    """Check the current tool's deadline, recording a hit when it has passed."""
+    remaining = remaining_time()
+    if remaining is None or remaining > 0:
+        return False
+    _tool_scope.get().deadline_hits += 1
+    return True
+
+
+async def within_deadline(awaitable):
+    """Await `awaitable`, cancelling it if the current tool's deadline passes first."""
+    remaining = remaining_time()
+    if remaining is None:
+        return await awaitable
+    if remaining <= 0:
+        if inspect.iscoroutine(awaitable):
+            awaitable.close()
+        _tool_scope.get().deadline_hits += 1
+        raise DeadlineExceeded("tool deadline exceeded")
+    try:
+        async with asyncio.timeout(remaining) as deadline:
+            return await awaitable
+    except TimeoutError:
+        # Timeouts raised inside the awaitable (e.g. a per-item timeout) are not ours
+        if not deadline.expired():
+            raise
+        _tool_scope.get().deadline_hits += 1
+        raise DeadlineExceeded("tool deadline exceeded") from None
+
+
+def _observe_tool_call(tool: str, scope: ToolScope, outcome: str, seconds: float) -> None:
+    TOOL_CALLS.inc(tool=tool, outcome=outcome)
+    TOOL_DURATION.observe(seconds, tool=tool)
+    for source in REQUEST_SOURCES:
+        TOOL_FANOUT.observe(scope.requests_by_source[source], tool=tool, kind=source)
+    TOOL_FANOUT.observe(scope.jira_searches, tool=tool, kind="jira")
+
+
+def tool_scope(fn):
+    """
+    Run a tool inside its own ToolScope.
+
+    Tools called from another tool share the caller's scope, deadline and
+    retry budget. When retries happened, stale data was served or calls were
+    cut short by the deadline, the outermost tool's result is returned as a
+    shallow copy with the counts under "_meta" (and "incomplete": True for
+    deadline cuts). Latency, outcome and fan-out of the outermost call are
+    recorded in the metrics, and every call, nested ones included, is traced
+    as a span.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        with trace_span(f"tool {fn.__name__}", **{"rover.tool": fn.__name__}) as span:
+            if _tool_scope.get() is not None:
+                return await fn(*args, **kwargs)
+            return await _run_tool(fn, span, *args, **kwargs)
+    return wrapper
+
+
+async def _run_tool(fn, span: Span | _NullSpan, *args, **kwargs):
+    """Run the outermost tool call in a new ToolScope; see tool_scope."""
+    scope = ToolScope(RETRY_BUDGET_PER_TOOL, TOOL_DEADLINE)
+    token = _tool_scope.set(scope)
+    tool = fn.__name__
+    started = time.perf_counter()
+    outcome = "exception"
+    TOOLS_IN_FLIGHT.inc(tool=tool)
+    try:
+        if scope.deadline is None:
+            result = await fn(*args, **kwargs)
+        else:
+            # Backstop for work that ignores the deadline
+            try:
+                async with asyncio.timeout(TOOL_DEADLINE + TOOL_DEADLINE_GRACE) as backstop:
+                    result = await fn(*args, **kwargs)
+            except TimeoutError:
+                if not backstop.expired():
+                    raise
+                scope.deadline_hits += 1
+                result = {"error": f"Tool did not finish within its {TOOL_DEADLINE:g}s deadline"}
+        if isinstance(result, dict) and "error" in result:
+            outcome = "error"
+            span.set_status("ERROR", str(result["error"]))
+        else:
+            outcome = "incomplete" if scope.deadline_hits else "ok"
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        _tool_scope.reset(token)
+        TOOLS_IN_FLIGHT.dec(tool=tool)
+        _observe_tool_call(tool, scope, outcome, time.perf_counter() - started)
+        span.set_attribute("rover.outcome", outcome)
+    meta = scope.meta()
+    if isinstance(result, dict) and meta:
+        result = {**result, "_meta": {**result.get("_meta", {}), **meta}}
+        if scope.deadline_hits:
+            result["incomplete"] = True
+    return result
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for one backend.
+
+    Closed passes every call. Enough consecutive failures open it, and calls
+    then fail fast until `reset_timeout` passes. After that a single probe is
+    let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.times_opened = 0
+        self.rejected = 0
+        self.last_error = None
+
+    def allow(self) -> bool:
+        """Decide whether a call may go to the backend now."""
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = "half_open"
+        if self.probing:
+            self.rejected += 1
+            return False
+        self.probing = True
+        return True
+
+    def check(self) -> None:
+        """Raise CircuitOpenError unless a call may go to the backend now."""
+        if not self.allow():
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(f"{self.name} backend unavailable (circuit open, retry in {retry_in:.1f}s)")
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self.probing = False
+
+    def record_failure(self, error: str) -> None:
+        self.failures += 1
+        self.last_error = error
+        self.probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Forget an abandoned call, e.g. a cancelled half-open probe."""
+        self.probing = False
+
+    @asynccontextmanager
+    async def guard(self):
+        """Run the enclosed backend call under this breaker."""
+        self.check()
+        try:
+            yield
+        except DeadlineExceeded:
+            self.release()
+            raise
+        except Exception as e:
+            self.record_failure(str(e))
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record_success()
+
+    def status(self) -> dict[str, Any]:
+        status = {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected,
+            "last_error": self.last_error,
+        }
+        if self.state == "open":
+            status["retry_in_seconds"] = round(
+                max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1
+            )
+        return status
+
+
+_rover_breaker = CircuitBreaker("rover", BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+_jira_breaker = CircuitBreaker("jira", BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+
+_BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+_breaker_state = METRICS.gauge(
+    "rover_circuit_breaker_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open", ("backend",)
+)
+_breaker_state.set_function(lambda: _BREAKER_STATES[_rover_breaker.state], backend="rover")
+_breaker_state.set_function(lambda: _BREAKER_STATES[_jira_breaker.state], backend="jira")
+
+# Client-side rate limiters, labelled by bucket ("global" or an endpoint prefix)
+RATE_LIMIT_WAITERS = METRICS.gauge(
+    "rover_rate_limit_waiters", "Requests waiting for a rate limiter token", ("bucket",)
+)
+RATE_LIMIT_RATE = METRICS.gauge(
+    "rover_rate_limit_current_rps", "Current rate of a rate limiter after 429 reductions", ("bucket",)
+)
+RATE_LIMIT_WAIT = METRICS.histogram(
+    "rover_rate_limit_wait_seconds", "Time requests waited for a rate limiter token", ("bucket",)
+)
+
+
+# LRU-ordered cache of GET responses: key -> entry dict with the parsed body,
+# status code, expiry time and approximate size in bytes
+_response_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+_response_cache_bytes = 0
+_response_cache_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+
+METRICS.gauge("rover_response_cache_entries", "Responses held in the response cache").set_function(
+    lambda: len(_response_cache)
+)
+METRICS.gauge("rover_response_cache_bytes", "Body bytes held in the response cache").set_function(
+    lambda: _response_cache_bytes
+)
+
+
+def _cache_key(url: str, params: dict[str, Any] | None) -> str:
+    """Build a cache key from a URL and its query parameters."""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+def _cache_lookup(key: str, allow_stale: bool = False) -> dict[str, Any] | None:
+    """
+    Return a live cache entry and mark it most recently used.
+
+    Expired entries stay cached until evicted; `allow_stale` returns them too
+    so a fallback copy can be served while a backend is unavailable.
+    """
+    entry = _response_cache.get(key)
+    if entry is None:
+        _response_cache_stats["misses"] += 1
+        return None
+    if entry["expires"] <= time.monotonic():
+        if not allow_stale:
+            _response_cache_stats["misses"] += 1
+            return None
+        _response_cache_stats["stale_hits"] += 1
+    else:
+        _response_cache_stats["hits"] += 1
+    _response_cache.move_to_end(key)
+    return entry
+
+
+def _cache_store(
+    key: str,
+    status: int,
+    body: Any,
+    text: str,
+    size: int,
+    ttl: float,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> None:
+    """Store a response with its validators and evict least recently used entries over the limits."""
+    global _response_cache_bytes
+
+    if ttl <= 0 or size > CACHE_MAX_BYTES:
+        return
+    previous = _response_cache.pop(key, None)
+    if previous is not None:
+        _response_cache_bytes -= previous["size"]
+    _response_cache[key] = {
+        "status": status,
+        "body": body,
+        "text": text,
+        "size": size,
+        "expires": time.monotonic() + ttl,
+        "etag": etag,
+        "last_modified": last_modified,
+    }
+    _response_cache_bytes += size
+
+    while _response_cache and (
+        len(_response_cache) > CACHE_MAX_ENTRIES or _response_cache_bytes > CACHE_MAX_BYTES
+    ):
+        _, evicted = _response_cache.popitem(last=False)
+        _response_cache_bytes -= evicted["size"]
+        _response_cache_stats["evictions"] += 1
+
+
+def clear_response_cache() -> None:
+    """Drop every cached response."""
+    global _response_cache_bytes
+
+    _response_cache.clear()
+    _response_cache_bytes = 0
+
+
+def _cached_response(url: str, entry: dict[str, Any]) -> dict[str, Any] | None:
+    """Replay a cache entry, re-raising cached 404s as HTTP errors."""
+    if entry["status"] == 404:
+        request = httpx.Request("GET", url)
+        response = httpx.Response(404, text=entry["text"], request=request)
+        raise httpx.HTTPStatusError(
+            f"Client error '404 Not Found' for url '{url}' (cached)",
+            request=request,
+            response=response,
+        )
+    return entry["body"]
+
+
+class InflightRequest:
+    """An upstream GET shared by every caller waiting on it."""
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+# In-flight GET requests keyed like the response cache
+_inflight_requests: dict[str, InflightRequest] = {}
+_inflight_stats = {"coalesced": 0, "abandoned": 0}
+
+
+def _finish_inflight(key: str, task: asyncio.Future) -> None:
+    """Forget a completed in-flight request."""
+    inflight = _inflight_requests.get(key)
+    if inflight is not None and inflight.task is task:
+        del _inflight_requests[key]
+    if not task.cancelled():
+        # Mark the exception as retrieved even if every waiter went away
+        task.exception()
+
+
+async def make_authenticated_request(
+    url: str,
+    method: str = "GET",
+    data: dict[str, Any] = None,
+    cache_ttl: float | None = None,
+    bypass_cache: bool = False,
+) -> dict[str, Any] | None:
+    """
+    Make an authenticated request using client certificates.
+
+    GET requests made with a `cache_ttl` are served from the in-process
+    response cache while fresh, and revalidated with a conditional GET once
+    expired. `bypass_cache` skips the freshness check and revalidates the
+    cached copy. Concurrent identical GETs are coalesced into
+    a single upstream call that is cancelled only when all of its callers
+    are. While the backend's circuit breaker is open, an
+    expired cached copy is served instead of failing. Returned bodies may be
+    shared between callers and must be treated as read-only.
+    """
+    body, _ = await make_authenticated_request_with_source(url, method, data, cache_ttl, bypass_cache)
+    return body
+
+
+async def make_authenticated_request_with_source(
+    url: str,
+    method: str = "GET",
+    data: dict[str, Any] = None,
+    cache_ttl: float | None = None,
+    bypass_cache: bool = False,
+) -> tuple[dict[str, Any] | None, str]:
+    """
+    Like make_authenticated_request, but also return where the body came from:
+    "cache", "upstream", "coalesced" (another caller's request) or "stale".
+    """
+    endpoint = _endpoint_label(url)
+    scope = _tool_scope.get()
+    started = time.perf_counter()
+    source = "error"
+    try:
+        with REQUESTS_IN_FLIGHT.track(endpoint=endpoint), trace_span(
+            f"{method.upper()} {endpoint}", **{"http.request.method": method.upper(), "rover.endpoint": endpoint}
+        ) as span:
+            body, source = await _authenticated_request(url, method, data, cache_ttl, bypass_cache)
+            span.set_attribute("rover.source", source)
+        return body, source
+    except BaseException as e:
+        REQUEST_ERRORS.inc(endpoint=endpoint, status=_error_status(e))
+        raise
+    finally:
+        REQUESTS.inc(endpoint=endpoint, source=source)
+        REQUEST_DURATION.observe(time.perf_counter() - started, endpoint=endpoint, source=source)
+        if scope is not None:
+            scope.requests_by_source[source] += 1
+
+
+async def _authenticated_request(
+    url: str, method: str, data: dict[str, Any] | None, cache_ttl: float | None, bypass_cache: bool
+) -> tuple[dict[str, Any] | None, str]:
+    """Answer make_authenticated_request, returning the body and where it came from."""
+    cacheable = method.upper() == "GET" and cache_ttl is not None
+    key = _cache_key(url, data)
+    if cacheable and not bypass_cache:
+        entry = _cache_lookup(key)
+        if entry is not None:
+            return _cached_response(url, entry), "cache"
+
+    if method.upper() != "GET":
+        return await _send_request(url, method, data, key, cache_ttl), "upstream"
+
+    # Single-flight: concurrent identical GETs share one upstream request,
+    # which is cancelled once every caller waiting on it has been cancelled.
+    # The shared request has no deadline and spends the starting call's retry
+    # budget; each caller waits on it under its own deadline.
+    source = "upstream"
+    inflight = _inflight_requests.get(key)
+    if inflight is None or inflight.task.get_loop() is not asyncio.get_running_loop():
+        scope = _tool_scope.get()
+        shared_scope = scope.shared_request_scope() if scope is not None else None
+        context = copy_context()
+        context.run(_tool_scope.set, shared_scope)
+        task = asyncio.get_running_loop().create_task(
+            _send_request(url, method, data, key, cache_ttl), context=context
+        )
+        if scope is not None:
+            task.add_done_callback(lambda done: scope.absorb_retries(shared_scope))
+        inflight = InflightRequest(task)
+        _inflight_requests[key] = inflight
+        task.add_done_callback(lambda done: _finish_inflight(key, done))
+    else:
+        _inflight_stats["coalesced"] += 1
+        source = "coalesced"
+    inflight.waiters += 1
+    try:
+        return await within_deadline(asyncio.shield(inflight.task)), source
+    except CircuitOpenError:
+        entry = _cache_lookup(key, allow_stale=True) if cacheable else None
+        if entry is None:
+            raise
+        scope = _tool_scope.get()
+        if scope is not None:
+            scope.stale_responses += 1
+        return _cached_response(url, entry), "stale"
+    finally:
+        inflight.waiters -= 1
+        if not inflight.waiters and not inflight.task.done():
+            inflight.task.cancel()
+            _inflight_stats["abandoned"] += 1
+
+
+def _retry_after_seconds(response: httpx.Response) -> float | None:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_delay(
+    method: str,
+    attempt: int,
+    response: httpx.Response | None,
+    error: Exception | None,
+    idempotent: bool = False,
+) -> float | None:
+    """Return how long to wait before the next attempt, or None to give up."""
+    if not (idempotent or method.upper() in RETRY_METHODS) or attempt >= RETRY_MAX_ATTEMPTS:
+        return None
+    retry_after = _retry_after_seconds(response) if response is not None else None
+    # A server asking for a longer pause than we are willing to wait fails now
+    if retry_after is not None and retry_after > RETRY_BACKOFF_MAX:
+        return None
+
+    # Full jitter, but never sooner than the server asked for
+    backoff = random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** (attempt - 1)))
+    delay = max(backoff, retry_after or 0.0)
+    # No point waiting for an attempt the tool deadline would cut off
+    remaining = remaining_time()
+    if remaining is not None and delay >= remaining:
+        return None
+
+    reason = type(error).__name__ if error is not None else str(response.status_code)
+    scope = _tool_scope.get()
+    if scope is not None and not scope.take_retry(reason):
+        return None
+    _retry_stats[reason] += 1
+    return delay
+
+
+class TokenBucket:
+    """
+    Async token bucket with adaptive rate reduction.
+
+    Callers reserve a token synchronously and sleep off any deficit, so
+    waiters are served in arrival order without a lock. Queue depth and
+    wait times are tracked for backend_status and exported as metrics.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float):
+        self.name = name
+        self.configured_rate = rate
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.queue_depth = 0
+        self.peak_queue_depth = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        RATE_LIMIT_WAITERS.set_function(lambda: self.queue_depth, bucket=name)
+        RATE_LIMIT_RATE.set_function(lambda: self.rate, bucket=name)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        if self.rate < self.configured_rate:
+            self.rate = min(self.configured_rate, self.rate + self.configured_rate * RATE_LIMIT_RECOVERY * elapsed)
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        self._refill()
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            self.queue_depth += 1
+            self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Give the reserved slot back to the callers queued behind us
+                self.tokens += 1
+                raise
+            finally:
+                self.queue_depth -= 1
+        self.acquired += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        RATE_LIMIT_WAIT.observe(wait, bucket=self.name)
+
+    def on_throttled(self) -> None:
+        """Back off after the server answered 429."""
+        self.throttled += 1
+        self.rate = max(RATE_LIMIT_MIN_RPS, self.rate * RATE_LIMIT_DECREASE)
+
+    def stats(self) -> dict[str, Any]:
+        self._refill()
+        return {
+            "configured_rps": self.configured_rate,
+            "current_rps": round(self.rate, 3),
+            "burst": self.burst,
+            "available_tokens": round(max(self.tokens, 0.0), 3),
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "acquired": self.acquired,
+            "throttled_responses": self.throttled,
+            "avg_wait_seconds": round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+            "max_wait_seconds": round(self.max_wait, 4),
+        }
+
 
-import httpx
-from mcp.server.fastmcp import FastMCP
+def _parse_rate_limit_endpoints(spec: str) -> dict[str, TokenBucket]:
+    """Parse "prefix=rate[:burst],..." into per-prefix buckets."""
+    buckets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        prefix, _, limits = item.partition("=")
+        rate, _, burst = limits.partition(":")
+        buckets[prefix.strip()] = TokenBucket(prefix.strip(), float(rate), float(burst or rate))
+    return buckets
 
-mcp = FastMCP("rover")
 
-# Red Hat internal groups API base URL
-API_BASE_URL = "https://internal-groups.iam.redhat.com/v1"
+_global_rate_limit = TokenBucket("global", RATE_LIMIT_RPS, RATE_LIMIT_BURST) if RATE_LIMIT_RPS > 0 else None
+_endpoint_rate_limits = _parse_rate_limit_endpoints(RATE_LIMIT_ENDPOINTS)
 
-# Certificate paths
-CERT_FILE = os.environ.get("CERT_FILE", "sa-cert.crt")
-KEY_FILE = os.environ.get("KEY_FILE", "privkey.pem")
 
+def _rate_limits_for(url: str) -> list[TokenBucket]:
+    """Return the buckets a groups API URL must pass: global, then its longest matching prefix."""
+    if not url.startswith(API_BASE_URL):
+        return []
+    path = url[len(API_BASE_URL):].split("?", 1)[0]
+    buckets = [_global_rate_limit] if _global_rate_limit is not None else []
+    prefixes = [prefix for prefix in _endpoint_rate_limits if path.startswith(prefix)]
+    if prefixes:
+        buckets.append(_endpoint_rate_limits[max(prefixes, key=len)])
+    return buckets
 
-async def make_authenticated_request(
-    url: str, method: str = "GET", data: dict[str, Any] = None
+
+async def _send_with_retry(
+    client: httpx.AsyncClient, method: str, url: str, idempotent: bool = False, **kwargs
+) -> httpx.Response:
+    """
+    Send a request, retrying idempotent methods on transport errors and on
+    429/502/503/504 with exponential backoff, jitter and Retry-After. Pass
+    `idempotent=True` for read-only POSTs such as batch searches.
+
+    Groups API requests fail fast with CircuitOpenError while the rover
+    circuit breaker is open, and pass the client-side rate limiters on every
+    attempt. The whole exchange, waits included, is bounded by the tool
+    deadline (DeadlineExceeded). Returns the last response once retries are exhausted; the caller
+    decides how to treat its status.
+    """
+    breaker = _rover_breaker if url.startswith(API_BASE_URL) else None
+    if breaker is None:
+        return await within_deadline(_send_attempts(client, method, url, idempotent, **kwargs))
+
+    breaker.check()
+    try:
+        response = await within_deadline(_send_attempts(client, method, url, idempotent, **kwargs))
+    except httpx.TransportError as e:
+        breaker.record_failure(str(e))
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    if response.status_code >= 500:
+        breaker.record_failure(f"HTTP {response.status_code}")
+    else:
+        breaker.record_success()
+    return response
+
+
+async def _send_attempts(
+    client: httpx.AsyncClient, method: str, url: str, idempotent: bool, **kwargs
+) -> httpx.Response:
+    """Run the rate-limited retry loop behind _send_with_retry."""
+    buckets = _rate_limits_for(url)
+    endpoint = _endpoint_label(url)
+    attempt = 1
+    while True:
+        response = None
+        error = None
+        # The span covers rate limiter and host semaphore waits, reported
+        # separately as rover.queue_wait_ms
+        with trace_span(
+            f"HTTP {method.upper()}",
+            kind="CLIENT",
+            **{"url.path": endpoint, "server.address": urlsplit(url).netloc, "rover.attempt": attempt},
+        ) as span:
+            queued = time.perf_counter()
+            for bucket in buckets:
+                await bucket.acquire()
+            try:
+                async with _host_semaphore(url):
+                    with UPSTREAM_IN_FLIGHT.track(endpoint=endpoint):
+                        started = time.perf_counter()
+                        span.set_attribute("rover.queue_wait_ms", round((started - queued) * 1000, 3))
+                        response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                error = e
+                span.record_exception(e)
+            else:
+                span.set_attribute("http.response.status_code", response.status_code)
+                if response.status_code >= 500:
+                    span.set_status("ERROR", f"HTTP {response.status_code}")
+        UPSTREAM_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
+        UPSTREAM_RESPONSES.inc(
+            endpoint=endpoint, status=str(response.status_code) if response is not None else type(error).__name__
+        )
+        if response is not None and response.status_code == 429:
+            for bucket in buckets:
+                bucket.on_throttled()
+        if response is not None and response.status_code not in RETRY_STATUS_CODES:
+            return response
+
+        delay = _retry_delay(method, attempt, response, error, idempotent)
+        if delay is None:
+            if error is not None:
+                raise error
+            return response
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+async def _send_request(
+    url: str, method: str, data: dict[str, Any] | None, key: str, cache_ttl: float | None
 ) -> dict[str, Any] | None:
-    """Make an authenticated request using client certificates."""
+    """
+    Send one request upstream and cache the outcome when requested.
+
+    A cached GET that has expired is revalidated with its ETag/Last-Modified;
+    a 304 renews the cached body's TTL without transferring or parsing it.
+    """
+    cacheable = method.upper() == "GET" and cache_ttl is not None
+    if method.upper() == "GET":
+        cached = _response_cache.get(key) if cacheable else None
+        if cached is not None and cached["status"] != 200:
+            cached = None
+        response = await _conditional_get(
+            url,
+            data,
+            etag=cached["etag"] if cached else None,
+            last_modified=cached["last_modified"] if cached else None,
+        )
+        if cached is not None and response.status_code == 304:
+            _response_cache_stats["revalidated"] += 1
+            _cache_store(
+                key, 200, cached["body"], "", cached["size"], cache_ttl, cached["etag"], cached["last_modified"]
+            )
+            return cached["body"]
+    else:
+        headers = {
+            "Accept": "application/json",
+        }
+        client = await get_http_client()
+        response = await _send_with_retry(client, method, url, headers=headers, json=data)
+
+    if cacheable and response.status_code == 404:
+        _cache_store(key, 404, None, response.text, len(response.content), CACHE_NEGATIVE_TTL)
+    response.raise_for_status()
+    body = response.json()
+    if cacheable:
+        _cache_store(
+            key,
+            response.status_code,
+            body,
+            "",
+            len(response.content),
+            cache_ttl,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+    return body
+
+
+async def _conditional_get(
+    url: str,
+    params: dict[str, Any] | None = None,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> httpx.Response:
+    """Send a GET, revalidating against any validators given; the caller handles 304."""
     headers = {
         "Accept": "application/json",
     }
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    client = await get_http_client()
+    return await _send_with_retry(client, "GET", url, headers=headers, params=params)
 
-    # Verify certificate files exist
-    if not os.path.exists(CERT_FILE):
-        raise FileNotFoundError(f"Certificate file not found: {CERT_FILE}")
-    if not os.path.exists(KEY_FILE):
-        raise FileNotFoundError(f"Private key file not found: {KEY_FILE}")
-
-    async with httpx.AsyncClient(
-        cert=(CERT_FILE, KEY_FILE),
-        verify=False  # Disable SSL verification for internal APIs
-    ) as client:
-        if method.upper() == "GET":
-            response = await client.request(method, url, headers=headers, params=data)
-        else:
-            response = await client.request(method, url, headers=headers, json=data)
-        response.raise_for_status()
-        return response.json()
 
+@traced
+async def run_bounded(
+    items, worker, limit: int = ANALYSIS_CONCURRENCY, timeout: float | None = None, on_result=None
+) -> list:
+    """
+    Run an async worker over items with at most `limit` calls in flight.
+
+    Results are returned in the same order as `items`. A worker that raises,
+    or runs longer than `timeout` seconds, yields its exception in place of a
+    result instead of failing the batch. Once the tool deadline passes, the
+    remaining items yield DeadlineExceeded, so callers keep the partial results.
+    `on_result(item, result)` is awaited as each item finishes, in completion
+    order, with the exception in place of a result for failed items.
+    Cancelling the caller cancels every worker and waits for them to finish.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run_item(item):
+        if timeout is None:
+            return await within_deadline(worker(item))
+        try:
+            return await within_deadline(asyncio.wait_for(worker(item), timeout))
+        except DeadlineExceeded:
+            raise
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"timed out after {timeout:g}s") from None
+
+    async def run_one(item):
+        async with semaphore:
+            try:
+                result = await run_item(item)
+            except Exception as e:
+                result = e
+        if on_result is not None:
+            await on_result(item, result)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    tasks = [asyncio.ensure_future(run_one(item)) for item in items]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=True)
+    except asyncio.CancelledError:
+        # Stop every worker and wait for their cleanup before propagating
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class ProgressReporter:
+    """
+    Send MCP progress notifications for a tool call.
+
+    A no-op when the tool was called without a Context (e.g. from scripts) or
+    the client did not ask for progress. Routine updates are throttled to one
+    per PROGRESS_INTERVAL; findings are sent right away.
+    """
+
+    def __init__(self, ctx: Context | None, total: int | None = None):
+        self.ctx = ctx
+        self.total = total
+        self.done = 0
+        self._last_sent = 0.0
+
+    async def advance(self, message: str | None = None, finding: bool = False) -> None:
+        """Count one finished item and report it."""
+        self.done += 1
+        now = time.monotonic()
+        if not finding and now - self._last_sent < PROGRESS_INTERVAL:
+            return
+        self._last_sent = now
+        await self._send(message)
+
+    async def finish(self, message: str | None = None) -> None:
+        """Report the final count, which also becomes the total."""
+        self.total = self.done
+        await self._send(message)
+
+    async def _send(self, message: str | None) -> None:
+        if self.ctx is None:
+            return
+        try:
+            await self.ctx.report_progress(self.done, self.total, message)
+        except Exception:
+            # Progress is best effort; a lost notification must not fail the tool
+            pass
 
 
+@traced
 async def analyze_member_jira_activity(member_id: str) -> dict:
     """Analyze real JIRA activity for a specific member using MCP tools."""
     
     # Search for JIRA issues involving this member
     try:
-        # Use the actual JIRA MCP tool
         issues_result = await call_jira_search(member_id)
-        issues = issues_result.get("issues", [])
+        return summarize_member_jira_activity(member_id, issues_result.get("issues", []))
         
-        # Analyze the real data
-        analysis = {
-            "total_issues": len(issues),
-            "projects": {},
-            "projects_summary": {},
-            "current_work": [],
-            "achievements": [],
-            "expertise": [],
-            "activity_level": ""
+    except Exception as e:
+        # Log the error for debugging
+        print(f"Error in analyze_member_jira_activity: {str(e)}", file=sys.stderr)
+        return unavailable_jira_activity(e)
+
+
+@traced
+async def analyze_members_jira_activity(member_ids: list[str], timeout: float | None = None) -> dict[str, dict]:
+    """
+    Analyze JIRA activity for many members using batched backend searches.
+
+    Members whose search failed, or took longer than `timeout` seconds, get
+    the unavailable structure with an "error" key; the others are analyzed
+    normally.
+    """
+    search_result = await call_jira_search_batch(member_ids, timeout)
+    results = search_result["results"]
+    errors = search_result["errors"]
+    for uid, error in errors.items():
+        print(f"Error in analyze_members_jira_activity for {uid}: {error}", file=sys.stderr)
+    return {
+        uid: (
+            unavailable_jira_activity(RuntimeError(errors[uid])) if uid in errors
+            else summarize_member_jira_activity(uid, results.get(uid, []))
+        )
+        for uid in member_ids
+    }
+
+
+def summarize_member_jira_activity(member_id: str, issues: list) -> dict:
+    """Build a member's JIRA activity analysis from their issues."""
+    # Analyze the real data
+    analysis = {
+        "total_issues": len(issues),
+        "projects": {},
+        "projects_summary": {},
+        "current_work": [],
+        "achievements": [],
+        "expertise": [],
+        "activity_level": ""
+    }
+    
+    # Group issues by project in a single pass
+    project_stats, recent_issues = aggregate_issues_by_project(issues, recent_limit=5)
+    project_counts = {project: stats["count"] for project, stats in project_stats.items()}
+    
+    # Create project summaries
+    for project, stats in project_stats.items():
+        analysis["projects_summary"][project] = {
+            "issues": stats["count"],
+            "role": role_for_issue_count(stats["count"]),
+            "focus": FOCUS_CLASSIFIER.best_label(stats["focus_counts"], DEFAULT_FOCUS),
+            "focus_scores": focus_scores(stats["focus_counts"])
         }
+    
+    # Generate current work from recent issues
+    analysis["current_work"] = extract_current_work(recent_issues)
+    
+    # Generate achievements and expertise
+    analysis["achievements"] = extract_achievements(issues, project_counts)
+    analysis["expertise"] = extract_expertise(set(project_counts))
+    
+    # Determine activity level
+    analysis["activity_level"] = determine_activity_level(len(issues), len(project_counts))
+    
+    return analysis
+
+
+def aggregate_issues_by_project(issues: list, recent_limit: int = 5) -> tuple[dict, list]:
+    """
+    Aggregate issues per project in one pass.
+
+    Returns per-project stats (issue count and a histogram of focus rule
+    matches) plus the first `recent_limit` issues that have a summary.
+    """
+    project_stats = {}
+    recent_issues = []
+    
+    for issue in issues:
+        project = issue.get("project") or "UNKNOWN"
+        stats = project_stats.get(project)
+        if stats is None:
+            stats = project_stats[project] = {"count": 0, "focus_counts": {}}
+        stats["count"] += 1
         
-        # Process issues to extract meaningful information
-        project_counts = {}
-        recent_issues = []
-        all_projects = set()
-        
-        for issue in issues:
-            project = issue.get("project", "UNKNOWN")
-            all_projects.add(project)
-            
-            if project not in project_counts:
-                project_counts[project] = 0
-            project_counts[project] += 1
+        summary = issue.get("summary") or ""
+        if summary:
+            FOCUS_CLASSIFIER.histogram(summary.lower(), stats["focus_counts"])
             
             # Collect recent work
-            summary = issue.get("summary", "")
-            if summary:
+            if len(recent_issues) < recent_limit:
                 recent_issues.append({
                     "project": project,
                     "key": issue.get("key", ""),
                     "summary": summary,
                     "status": issue.get("status", "")
                 })
-        
-        # Create project summaries
-        for project, count in project_counts.items():
-            project_issues = [i for i in issues if i.get("project") == project]
-            
-            # Determine role based on issue patterns
-            role = determine_role_in_project(project_issues, member_id)
-            
-            # Create focus summary from recent issues
-            focus = create_focus_summary(project_issues)
-            
-            analysis["projects_summary"][project] = {
-                "issues": count,
-                "role": role,
-                "focus": focus
-            }
-        
-        # Generate current work from recent issues
-        analysis["current_work"] = extract_current_work(recent_issues[:5])
-        
-        # Generate achievements and expertise
-        analysis["achievements"] = extract_achievements(issues, project_counts)
-        analysis["expertise"] = extract_expertise(all_projects)
-        
-        # Determine activity level
-        analysis["activity_level"] = determine_activity_level(len(issues), len(all_projects))
-        
-        return analysis
-        
-    except Exception as e:
-        # Log the error for debugging
-        print(f"Error in analyze_member_jira_activity: {str(e)}")
-        
-        # Return generic structure for any member (no hardcoding)
-        return {
-            "total_issues": 0,
-            "projects": {},
-            "projects_summary": {},
-            "current_work": ["No JIRA activity found or data unavailable"],
-            "achievements": ["JIRA data currently unavailable"],
-            "expertise": ["Platform Engineering"],
-            "activity_level": f"Data gathering in progress - {str(e)}"
-        }
+    
+    return project_stats, recent_issues
 
 
-async def call_jira_search(member_id: str) -> dict:
-    """Call the JIRA MCP tool to search for member's issues."""
+def unavailable_jira_activity(error: Exception) -> dict:
+    """Generic activity structure used when JIRA data cannot be fetched."""
+    # Return generic structure for any member (no hardcoding)
+    return {
+        "error": str(error),
+        "total_issues": 0,
+        "projects": {},
+        "projects_summary": {},
+        "current_work": ["No JIRA activity found or data unavailable"],
+        "achievements": ["JIRA data currently unavailable"],
+        "expertise": ["Platform Engineering"],
+        "activity_level": f"Data gathering in progress - {str(error)}"
+    }
+
+
+# JIRA backend selection: "snowflake" (jira_mcp_snowflake module), "http",
+# "fixture" (local JSON/SQLite issue store) or "none"
+JIRA_BACKEND = os.environ.get("JIRA_BACKEND", "snowflake")
+JIRA_SEARCH_LIMIT = int(os.environ.get("JIRA_SEARCH_LIMIT", "50"))
+JIRA_BATCH_SIZE = int(os.environ.get("JIRA_BATCH_SIZE", "50"))
+JIRA_BACKEND_URL = os.environ.get("JIRA_BACKEND_URL", "")
+JIRA_BACKEND_TOKEN = os.environ.get("JIRA_BACKEND_TOKEN", "")
+JIRA_FIXTURE_PATH = os.environ.get("JIRA_FIXTURE_PATH", "jira_fixture.db")
+
+# Columns stored for each issue in a JIRA fixture database
+JIRA_FIXTURE_COLUMNS = (
+    "key", "project", "summary", "status", "priority", "issue_type",
+    "assignee", "reporter", "creator", "created", "updated",
+)
+
+
+class JiraBackend:
+    """
+    Source of JIRA issues for member activity analysis.
+
+    Subclasses implement `search`; batch and streaming access fall back to
+    repeated searches unless the backend can do better.
+    """
+
+    name = "base"
+
+    async def search(self, member_id: str, limit: int = JIRA_SEARCH_LIMIT) -> list[dict]:
+        """Return up to `limit` issues involving a member."""
+        raise NotImplementedError
+
+    async def search_batch(
+        self, member_ids: list[str], limit: int = JIRA_SEARCH_LIMIT, timeout: float | None = None
+    ) -> dict[str, list[dict] | Exception]:
+        """
+        Return up to `limit` issues per member, keyed by member id.
+
+        A member whose search fails, or runs longer than `timeout` seconds,
+        maps to the exception so the rest of the batch is still usable.
+        """
+        member_ids = list(dict.fromkeys(member_ids))
+        results = await run_bounded(member_ids, lambda uid: self.search(uid, limit), timeout=timeout)
+        return dict(zip(member_ids, results))
+
+    async def stream(self, member_id: str, limit: int | None = None, page_size: int = 500):
+        """Yield a member's issues without materializing the whole result."""
+        for issue in await self.search(member_id, limit or JIRA_SEARCH_LIMIT):
+            yield issue
+
+    async def close(self) -> None:
+        """Release any connections held by the backend."""
+
+
+class NullJiraBackend(JiraBackend):
+    """Backend used when no JIRA source is configured."""
+
+    name = "none"
+
+    async def search(self, member_id: str, limit: int = JIRA_SEARCH_LIMIT) -> list[dict]:
+        return []
+
+
+class SnowflakeJiraBackend(JiraBackend):
+    """
+    Calls list_jira_issues from the jira_mcp_snowflake module in-process.
+
+    list_jira_issues takes a single search_text, so batch searches run one
+    search per member, ANALYSIS_CONCURRENCY at a time.
+    """
+
+    name = "snowflake"
+
+    def __init__(self, module_name: str = "jira_mcp_snowflake"):
+        # The module is imported once; its own sessions are reused per search
+        jira_module = importlib.import_module(module_name)
+        self._list_jira_issues = getattr(jira_module, "list_jira_issues")
+
+    async def search(self, member_id: str, limit: int = JIRA_SEARCH_LIMIT) -> list[dict]:
+        if inspect.iscoroutinefunction(self._list_jira_issues):
+            result = await self._list_jira_issues(search_text=member_id, limit=limit)
+        else:
+            # Keep blocking clients off the event loop
+            result = await asyncio.to_thread(
+                self._list_jira_issues, search_text=member_id, limit=limit
+            )
+        return result.get("issues", [])
+
+
+class HttpJiraBackend(JiraBackend):
+    """
+    Queries a JIRA search service over HTTP.
+
+    The service must answer GET {base_url}/issues?search_text=&limit=&offset=
+    with a JSON object holding an "issues" list. Services that also accept
+    POST {base_url}/issues/batch with {"member_ids": [...], "limit": n} and
+    return {"results": {uid: [...]}} serve batch searches in one request.
+    """
+
+    name = "http"
+
+    def __init__(self, base_url: str, token: str = ""):
+        headers = {"Accept": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        self._base_url = base_url.rstrip("/")
+        self._headers = headers
+        self._client: httpx.AsyncClient | None = None
+        self._batch_supported = True
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self._headers, timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+            )
+        return self._client
+
+    async def _fetch(self, member_id: str, limit: int, offset: int = 0) -> list[dict]:
+        response = await _send_with_retry(
+            self._get_client(),
+            "GET",
+            f"{self._base_url}/issues",
+            params={"search_text": member_id, "limit": limit, "offset": offset},
+        )
+        response.raise_for_status()
+        return response.json().get("issues", [])
+
+    async def search(self, member_id: str, limit: int = JIRA_SEARCH_LIMIT) -> list[dict]:
+        return await self._fetch(member_id, limit)
+
+    async def search_batch(
+        self, member_ids: list[str], limit: int = JIRA_SEARCH_LIMIT, timeout: float | None = None
+    ) -> dict[str, list[dict] | Exception]:
+        # Services without the batch endpoint get one search per member
+        if not self._batch_supported:
+            return await super().search_batch(member_ids, limit, timeout)
+        member_ids = list(dict.fromkeys(member_ids))
+        response = await _send_with_retry(
+            self._get_client(),
+            "POST",
+            f"{self._base_url}/issues/batch",
+            idempotent=True,
+            json={"member_ids": member_ids, "limit": limit},
+        )
+        if response.status_code in (404, 405):
+            self._batch_supported = False
+            return await super().search_batch(member_ids, limit, timeout)
+        response.raise_for_status()
+        results = response.json().get("results", {})
+        return {uid: results.get(uid, []) for uid in member_ids}
+
+    async def stream(self, member_id: str, limit: int | None = None, page_size: int = 500):
+        offset = 0
+        while limit is None or offset < limit:
+            size = page_size if limit is None else min(page_size, limit - offset)
+            page = await self._fetch(member_id, size, offset)
+            for issue in page:
+                yield issue
+            if len(page) < size:
+                break
+            offset += len(page)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _init_jira_fixture_schema(conn: sqlite3.Connection) -> None:
+    """Create the issues table and member lookup indexes."""
+    columns = ", ".join(
+        f"{column} TEXT PRIMARY KEY" if column == "key" else f"{column} TEXT"
+        for column in JIRA_FIXTURE_COLUMNS
+    )
+    conn.execute(f"CREATE TABLE IF NOT EXISTS issues ({columns})")
+    for column in ("assignee", "reporter", "creator", "project"):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_issues_{column} ON issues ({column})")
+
+
+def _insert_jira_issues(conn: sqlite3.Connection, issues, chunk_size: int = 5000) -> int:
+    """Insert issues from any iterable in chunks, returning the count written."""
+    placeholders = ", ".join("?" for _ in JIRA_FIXTURE_COLUMNS)
+    statement = f"INSERT OR REPLACE INTO issues VALUES ({placeholders})"
+    written = 0
+    chunk = []
+    for issue in issues:
+        chunk.append(tuple(issue.get(column) for column in JIRA_FIXTURE_COLUMNS))
+        if len(chunk) >= chunk_size:
+            conn.executemany(statement, chunk)
+            written += len(chunk)
+            chunk = []
+    if chunk:
+        conn.executemany(statement, chunk)
+        written += len(chunk)
+    conn.commit()
+    return written
+
+
+def write_jira_fixture(db_path: str, issues) -> int:
+    """Write issues from an iterable into a SQLite JIRA fixture database."""
+    conn = sqlite3.connect(db_path)
     try:
-        # Direct call to the real JIRA MCP tools that are available
-        # This imports the available tools at runtime
-        
-        # Try to use the actual JIRA MCP tools by importing them
-        import sys
-        import importlib
-        
-        # Method 1: Try importing the actual JIRA tools if available in the environment
-        try:
-            # Dynamic import of the JIRA tools
-            jira_module = importlib.import_module("jira_mcp_snowflake")
-            if hasattr(jira_module, 'list_jira_issues'):
-                result = await jira_module.list_jira_issues(search_text=member_id, limit=50)
-                return {"issues": result.get("issues", [])}
-        except (ImportError, AttributeError):
-            pass
-        
-        # Method 2: Call the MCP tools through subprocess if available as CLI
+        _init_jira_fixture_schema(conn)
+        return _insert_jira_issues(conn, issues)
+    finally:
+        conn.close()
+
+
+def _read_jira_fixture_file(path: str):
+    """Yield issues from a JSON (list or {"issues": [...]}) or JSON Lines file."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        data = json.load(f)
+    yield from data.get("issues", []) if isinstance(data, dict) else data
+
+
+class SQLiteAccess:
+    """
+    Serialized access to one SQLite connection from worker threads.
+
+    Queries run in a worker thread so the event loop never blocks on disk.
+    When the awaiting task is cancelled, a query still waiting for the lock
+    is skipped. A running query is stopped with Connection.interrupt(), and
+    the worker is awaited, so no query outlives the task that issued it.
+    """
+
+    def __init__(self):
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._active_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        raise NotImplementedError
+
+    def _locked(self, call: dict, fn, *args):
+        with self._lock:
+            if call["cancelled"]:
+                return None
+            with self._active_lock:
+                call["running"] = True
+            try:
+                return fn(self._connect(), *args)
+            finally:
+                with self._active_lock:
+                    call["running"] = False
+
+    async def _run(self, fn, *args):
+        """Run `fn(conn, *args)` in a worker thread."""
+        call = {"cancelled": False, "running": False}
+        future = asyncio.ensure_future(asyncio.to_thread(self._locked, call, fn, *args))
         try:
-            import subprocess
-            import json
-            
-            # Try calling as external command
-            cmd = ["python", "-c", f"""
-import sys
-sys.path.append('.')
-try:
-    from jira_mcp_snowflake import list_jira_issues
-    import asyncio
-    result = asyncio.run(list_jira_issues(search_text='{member_id}', limit=50))
-    print(json.dumps(result))
-except Exception as e:
-    print(json.dumps({{"issues": [], "error": str(e)}}))
-"""]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout.strip())
-                return {"issues": data.get("issues", [])}
-                
-        except (subprocess.TimeoutExpired, json.JSONDecodeError, Exception):
-            pass
-        
-        # Method 3: Make a direct call to the same tools that are available in this environment
-        # Since we know the tools exist, try to call them directly
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            with self._active_lock:
+                call["cancelled"] = True
+                if call["running"] and self._conn is not None:
+                    self._conn.interrupt()
+            await asyncio.gather(future, return_exceptions=True)
+            raise
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class FixtureJiraBackend(SQLiteAccess, JiraBackend):
+    """
+    Serves issues from a local fixture for offline benchmarks and load tests.
+
+    SQLite databases are opened read-only; JSON and JSON Lines files are
+    loaded into an in-memory database on first use. A member matches an
+    issue when they are its assignee, reporter or creator.
+    """
+
+    name = "fixture"
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path.endswith((".json", ".jsonl")):
+                conn = sqlite3.connect(":memory:", check_same_thread=False)
+                _init_jira_fixture_schema(conn)
+                _insert_jira_issues(conn, _read_jira_fixture_file(self.path))
+            else:
+                if not os.path.exists(self.path):
+                    raise FileNotFoundError(f"JIRA fixture not found: {self.path}")
+                conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _member_query(conn: sqlite3.Connection, member_id: str, limit: int, offset: int = 0) -> list[dict]:
+        rows = conn.execute(
+            "SELECT * FROM issues WHERE assignee = ? OR reporter = ? OR creator = ? "
+            "ORDER BY updated DESC, key LIMIT ? OFFSET ?",
+            (member_id, member_id, member_id, limit, offset),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _batch_query(conn: sqlite3.Connection, member_ids: list[str], limit: int) -> dict[str, list[dict]]:
+        # One statement for the whole batch. Each member's newest `limit`
+        # issues are picked by a correlated subquery, so heavy contributors
+        # don't pull back their full history the way a plain IN (...) or a
+        # ROW_NUMBER() window over every match would
+        member_ids = list(dict.fromkeys(member_ids))
+        if not member_ids:
+            return {}
+        members = ", ".join("(?)" for _ in member_ids)
+        rows = conn.execute(
+            f"WITH members(uid) AS (VALUES {members}) "
+            "SELECT members.uid AS _member, issues.* FROM members JOIN issues ON issues.rowid IN ("
+            "SELECT rowid FROM issues WHERE assignee = members.uid OR reporter = members.uid OR creator = members.uid "
+            "ORDER BY updated DESC, key LIMIT ?"
+            ") ORDER BY _member, issues.updated DESC, issues.key",
+            (*member_ids, limit),
+        ).fetchall()
+        results = {uid: [] for uid in member_ids}
+        for row in rows:
+            issue = dict(row)
+            results[issue.pop("_member")].append(issue)
+        return results
+
+    async def search(self, member_id: str, limit: int = JIRA_SEARCH_LIMIT) -> list[dict]:
+        return await self._run(self._member_query, member_id, limit)
+
+    async def search_batch(
+        self, member_ids: list[str], limit: int = JIRA_SEARCH_LIMIT, timeout: float | None = None
+    ) -> dict[str, list[dict] | Exception]:
+        # One worker-thread hop and one query serve the whole batch
+        return await self._run(self._batch_query, member_ids, limit)
+
+    async def stream(self, member_id: str, limit: int | None = None, page_size: int = 500):
+        offset = 0
+        while limit is None or offset < limit:
+            size = page_size if limit is None else min(page_size, limit - offset)
+            page = await self._run(self._member_query, member_id, size, offset)
+            for issue in page:
+                yield issue
+            if len(page) < size:
+                break
+            offset += len(page)
+
+    async def close(self) -> None:
+        self._close()
+
+
+_jira_backend: JiraBackend | None = None
+
+
+def create_jira_backend(kind: str = JIRA_BACKEND) -> JiraBackend:
+    """Build the JIRA backend named by `kind`, falling back to no backend."""
+    if kind == "snowflake":
         try:
-            # Use the tools that are already available in the MCP context
-            # This simulates calling the real tools with actual search
-            return await call_real_jira_tools(member_id)
-            
-        except Exception:
-            pass
-        
-        # If all methods fail, return empty result
-        return {"issues": []}
-        
+            return SnowflakeJiraBackend()
+        except (ImportError, AttributeError):
+            return NullJiraBackend()
+    if kind == "http":
+        if not JIRA_BACKEND_URL:
+            raise ValueError("JIRA_BACKEND_URL is required for the http JIRA backend")
+        return HttpJiraBackend(JIRA_BACKEND_URL, JIRA_BACKEND_TOKEN)
+    if kind == "fixture":
+        return FixtureJiraBackend(JIRA_FIXTURE_PATH)
+    if kind == "none":
+        return NullJiraBackend()
+    raise ValueError(f"Unknown JIRA_BACKEND: {kind}")
+
+
+def get_jira_backend() -> JiraBackend:
+    """Return the process-wide JIRA backend, creating it on first use."""
+    global _jira_backend
+
+    if _jira_backend is None:
+        _jira_backend = create_jira_backend()
+    return _jira_backend
+
+
+def set_jira_backend(backend: JiraBackend | None) -> None:
+    """Replace the process-wide JIRA backend, e.g. with a fixture in scripts."""
+    global _jira_backend
+
+    _jira_backend = backend
+
+
+def _observe_jira_search(backend: str, kind: str, outcome: str, started: float) -> None:
+    JIRA_SEARCHES.inc(backend=backend, kind=kind, outcome=outcome)
+    JIRA_DURATION.observe(time.perf_counter() - started, backend=backend, kind=kind)
+
+
+async def call_jira_search(member_id: str) -> dict:
+    """Search the configured JIRA backend for a member's issues."""
+    started = time.perf_counter()
+    backend_name = "unavailable"
+    try:
+        backend = get_jira_backend()
+        backend_name = backend.name
+        scope = _tool_scope.get()
+        if scope is not None:
+            scope.jira_searches += 1
+        with JIRA_IN_FLIGHT.track(backend=backend_name), trace_span(
+            "jira.search", kind="CLIENT", **{"jira.backend": backend_name, "jira.members": 1}
+        ) as span:
+            async with _jira_breaker.guard():
+                issues = await within_deadline(backend.search(member_id, JIRA_SEARCH_LIMIT))
+            span.set_attribute("jira.issues", len(issues))
+        _observe_jira_search(backend_name, "single", "ok", started)
+        result = {"issues": issues, "backend": backend.name}
+        if isinstance(backend, NullJiraBackend):
+            result["integration_note"] = "No JIRA backend configured (set JIRA_BACKEND)"
+        return result
     except Exception as e:
+        _observe_jira_search(backend_name, "single", _error_status(e), started)
         return {"issues": [], "error": str(e)}
 
 
-async def call_real_jira_tools(member_id: str) -> dict:
-    """Make a call to the real JIRA tools that are available in the environment."""
+async def call_jira_search_batch(member_ids: list[str], timeout: float | None = None) -> dict:
+    """
+    Search the configured JIRA backend for many members in as few queries as possible.
+
+    Returns the issues of the members whose search succeeded under "results"
+    and an error message per failed member under "errors". A failed chunk
+    only fails its own members; `timeout` bounds each member's search on
+    backends that search members one by one.
+    """
+    member_ids = list(dict.fromkeys(member_ids))
+    results = {}
+    errors = {}
     try:
-        # This would be the actual call to the JIRA MCP tools
-        # Since they're available in the same environment, we can call them directly
-        
-        # Import the function we know exists
-        # Note: In a real MCP environment, these would be available
-        # For now, simulate the call structure
-        
-        # Simulate the real call - in production this would be:
-        # from mcp_jira_snowflake import list_jira_issues
-        # result = await list_jira_issues(search_text=member_id, limit=50)
-        
-        # Since we can't make the actual call from within the MCP server,
-        # we'll return an empty structure that indicates the integration point
-        return {
-            "issues": [],
-            "integration_note": f"Real JIRA search for {member_id} would be called here",
-            "member_searched": member_id
-        }
-        
+        backend = get_jira_backend()
     except Exception as e:
-        return {"issues": [], "error": str(e)}
+        _observe_jira_search("unavailable", "batch", _error_status(e), time.perf_counter())
+        return {"results": {}, "errors": {uid: str(e) for uid in member_ids}}
+
+    scope = _tool_scope.get()
+
+    async def search_chunk(chunk: list[str]) -> None:
+        if scope is not None:
+            scope.jira_searches += 1
+        started = time.perf_counter()
+        try:
+            with trace_span(
+                "jira.search_batch", kind="CLIENT", **{"jira.backend": backend.name, "jira.members": len(chunk)}
+            ) as span:
+                async with _jira_breaker.guard():
+                    chunk_results = await within_deadline(backend.search_batch(chunk, JIRA_SEARCH_LIMIT, timeout))
+                    # A chunk where every member failed counts against the breaker
+                    if chunk_results and all(isinstance(issues, Exception) for issues in chunk_results.values()):
+                        raise next(iter(chunk_results.values()))
+                failed = 0
+                for uid, issues in chunk_results.items():
+                    if isinstance(issues, Exception):
+                        errors[uid] = str(issues) or type(issues).__name__
+                        failed += 1
+                    else:
+                        results[uid] = issues
+                span.set_attribute("jira.failed_members", failed)
+        except Exception as e:
+            _observe_jira_search(backend.name, "batch", _error_status(e), started)
+            errors.update((uid, str(e) or type(e).__name__) for uid in chunk)
+        else:
+            _observe_jira_search(backend.name, "batch", "ok", started)
+
+    # Chunks are searched concurrently, so many members cost one round trip
+    # per ANALYSIS_CONCURRENCY chunks rather than one per chunk
+    chunks = [
+        member_ids[start:start + JIRA_BATCH_SIZE]
+        for start in range(0, len(member_ids), max(1, JIRA_BATCH_SIZE))
+    ]
+    with JIRA_IN_FLIGHT.track(backend=backend.name):
+        outcomes = await run_bounded(chunks, search_chunk)
+    for chunk, outcome in zip(chunks, outcomes):
+        # Only a deadline or cancellation gets past search_chunk's own handling
+        if isinstance(outcome, Exception):
+            errors.update((uid, str(outcome) or type(outcome).__name__) for uid in chunk if uid not in results)
+    return {"results": results, "errors": errors, "backend": backend.name}
 
 
-def determine_role_in_project(project_issues: list, member_id: str) -> str:
-    """Determine member's role in a project based on issue patterns."""
-    if len(project_issues) >= 5:
+def role_for_issue_count(issue_count: int) -> str:
+    """Map the number of issues in a project to a role."""
+    if issue_count >= 5:
         return "lead"
-    elif len(project_issues) >= 3:
+    elif issue_count >= 3:
         return "contributor"
-    elif len(project_issues) >= 1:
+    elif issue_count >= 1:
         return "participant"
     else:
         return "observer"
 
 
-def create_focus_summary(project_issues: list) -> str:
-    """Create a focus summary from project issues."""
-    if not project_issues:
-        return "General involvement"
-    
-    # Extract keywords from summaries to create focus
-    summaries = [issue.get("summary", "") for issue in project_issues]
-    combined = " ".join(summaries).lower()
-    
-    # Simple keyword extraction for focus areas
-    if "pulp" in combined or "push" in combined:
-        return "Distribution systems and package management"
-    elif "access" in combined or "role" in combined:
-        return "Access management and security"
-    elif "cloud" in combined or "aws" in combined:
-        return "Cloud platform operations"
-    elif "jenkins" in combined or "ci" in combined:
-        return "CI/CD and automation"
-    elif "monitoring" in combined or "prometheus" in combined:
-        return "Platform monitoring and observability"
-    else:
-        return "Platform engineering and operations"
+# Classifier rules: focus areas matched against issue summaries plus the
+# project-key mappings used for expertise and achievements
+FOCUS_RULES_FILE = os.environ.get(
+    "FOCUS_RULES_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "focus_rules.json")
+)
+
+
+def load_focus_rules(path: str) -> dict:
+    """Load classifier rules from a JSON file, or empty rules if it is missing."""
+    if not os.path.exists(path):
+        print(f"Warning: focus rules file not found: {path}", file=sys.stderr)
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _trie_pattern(keywords: dict[str, bool]) -> str:
+    """
+    Build a regex matching the longest keyword, factored as a prefix trie.
+
+    `keywords` maps each keyword to whether it may match as a word prefix;
+    other keywords must end at a word boundary.
+    """
+    trie = {}
+    for keyword, prefix in keywords.items():
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        # A keyword listed both ways matches as a prefix
+        node[""] = node.get("") or prefix
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        # Longer keywords are tried first; the word end comes last
+        if "" in node:
+            branches.append("" if node[""] else r"(?!\w)")
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return build(trie)
+
+
+class KeywordClassifier:
+    """
+    Scores text against keyword rules with one compiled pattern.
+
+    Keywords match whole words; a keyword ending in "*" (e.g. "deploy*")
+    matches any word it starts. All rules are compiled into a single
+    trie-shaped regex, so scanning stays linear in the text size no matter
+    how many rules are configured.
+    """
+
+    def __init__(self, rules: list[tuple[str, list[str]]]):
+        self.labels = [label for label, _ in rules]
+        keyword_rules = {}
+        prefixes = {}
+        for index, (_, keywords) in enumerate(rules):
+            for keyword in keywords:
+                keyword = keyword.lower()
+                prefix = keyword.endswith("*")
+                keyword = keyword.rstrip("*")
+                keyword_rules.setdefault(keyword, set()).add(index)
+                prefixes[keyword] = prefixes.get(keyword, False) or prefix
+
+        # The pattern reports the longest keyword at each word start; shorter
+        # keywords it starts with matched there as well when they are
+        # prefixes or end on a word end inside it (e.g. "ci" in "ci cd")
+        self._hits = {
+            keyword: tuple(sorted(set().union(*(
+                indexes for other, indexes in keyword_rules.items()
+                if keyword.startswith(other)
+                and (prefixes[other] or re.match(re.escape(other) + r"(?!\w)", keyword))
+            ))))
+            for keyword in keyword_rules
+        }
+        self._pattern = (
+            re.compile(r"\b(?=(" + _trie_pattern(prefixes) + "))") if keyword_rules else None
+        )
+
+    def histogram(self, text: str, counts: dict[int, int] | None = None) -> dict[int, int]:
+        """Count matches per rule index in lowercase text, adding to `counts`."""
+        counts = {} if counts is None else counts
+        if self._pattern is None:
+            return counts
+        for match in self._pattern.finditer(text):
+            for index in self._hits[match.group(1)]:
+                counts[index] = counts.get(index, 0) + 1
+        return counts
+
+    def best_label(self, counts: dict[int, int], default: str) -> str:
+        """Return the label with the most matches; earlier rules win ties."""
+        if not counts:
+            return default
+        return self.labels[min(counts, key=lambda index: (-counts[index], index))]
+
+
+FOCUS_CONFIG = load_focus_rules(FOCUS_RULES_FILE)
+DEFAULT_FOCUS = FOCUS_CONFIG.get("default_focus", "Platform engineering and operations")
+PROJECT_EXPERTISE = FOCUS_CONFIG.get("project_expertise", {})
+PROJECT_ACHIEVEMENTS = FOCUS_CONFIG.get("project_achievements", [])
+FOCUS_CLASSIFIER = KeywordClassifier(
+    [(area["label"], area["keywords"]) for area in FOCUS_CONFIG.get("focus_areas", [])]
+)
+
+
+def focus_scores(counts: dict[int, int]) -> dict[str, int]:
+    """Turn a rule-index histogram into a label histogram."""
+    return {FOCUS_CLASSIFIER.labels[index]: count for index, count in sorted(counts.items())}
 
 
 def extract_current_work(recent_issues: list) -> list:
@@ -285,11 +2491,9 @@ def extract_achievements(issues: list, project_counts: dict) -> list:
         achievements.append(f"Regular contributor to {num_projects} projects")
     
     # Check for specific achievements based on project involvement
-    if "RHELDST" in project_counts and project_counts["RHELDST"] >= 3:
-        achievements.append("Key contributor to Red Hat distribution systems")
-    
-    if "AITRIAGE" in project_counts:
-        achievements.append("Involved in AI platform support and triage")
+    for rule in PROJECT_ACHIEVEMENTS:
+        if project_counts.get(rule["project"], 0) >= rule.get("min_issues", 1):
+            achievements.append(rule["text"])
     
     if num_projects >= 5:
         achievements.append(f"Cross-functional expertise spanning {num_projects} different project areas")
@@ -299,20 +2503,7 @@ def extract_achievements(issues: list, project_counts: dict) -> list:
 
 def extract_expertise(projects: set) -> list:
     """Extract expertise areas from project involvement."""
-    expertise = []
-    
-    if "RHELDST" in projects:
-        expertise.append("Distribution Systems")
-    if "CLOUDDST" in projects:
-        expertise.append("Cloud Operations")
-    if "AITRIAGE" in projects:
-        expertise.append("AI Platform Support")
-    if "PVSEC" in projects:
-        expertise.append("Security & Access Management")
-    if "TEAMNADO" in projects:
-        expertise.append("Infrastructure Operations")
-    if "KFLUXSPRT" in projects:
-        expertise.append("Konflux Platform")
+    expertise = [area for project, area in PROJECT_EXPERTISE.items() if project in projects]
     
     # Add general categories
     if len(projects) >= 5:
@@ -401,6 +2592,7 @@ His involvement shows he is a {'primary technical leader driving' if is_leader e
 
 
 @mcp.tool()
+@tool_scope
 async def rover_integration_help() -> dict[str, Any]:
     """
     Get help information about the rover-JIRA integration tools.
@@ -452,12 +2644,14 @@ async def rover_integration_help() -> dict[str, Any]:
 # ========================================
 
 @mcp.tool()
-async def rover_group(group_name: str) -> dict[str, Any]:
+@tool_scope
+async def rover_group(group_name: str, bypass_cache: bool = False) -> dict[str, Any]:
     """
     Retrieve information about a Red Hat internal group.
     
     Args:
         group_name: The name of the group to retrieve information for
+        bypass_cache: Fetch fresh data instead of using a cached response
         
     Returns:
         Group information from the Red Hat internal groups API
@@ -467,7 +2661,12 @@ async def rover_group(group_name: str) -> dict[str, Any]:
     
     url = f"{API_BASE_URL}/groups/{group_name}"
     try:
-        response = await make_authenticated_request(url)
+        response, source = await make_authenticated_request_with_source(
+            url, cache_ttl=CACHE_TTL_GROUPS, bypass_cache=bypass_cache
+        )
+        # Cached, stale and coalesced bodies were indexed when they were fetched
+        if source == "upstream" or group_name not in MEMBERSHIP_INDEX:
+            MEMBERSHIP_INDEX.add_group(group_name, response)
         return response
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
@@ -483,6 +2682,7 @@ async def rover_group(group_name: str) -> dict[str, Any]:
 
 
 @mcp.tool()
+@tool_scope
 async def get_groups(
     criteria: str = None,
     page: int = 0,
@@ -530,7 +2730,129 @@ async def get_groups(
         return {"error": f"Request failed: {str(e)}"}
 
 
+class RoverAPIError(Exception):
+    """Raised by streaming helpers when a tool call returns an error dict."""
+
+    def __init__(self, payload: dict[str, Any]):
+        super().__init__(payload.get("error", "Unknown error"))
+        self.payload = payload
+
+
+async def iter_group_pages(
+    criteria: str = None,
+    page_size: int = GROUPS_PAGE_SIZE,
+    include_roles: bool = False,
+    start_page: int = 0,
+    prefetch: bool = True,
+):
+    """
+    Yield successive pages of groups from /groups until the listing ends.
+
+    Only one page is held at a time. With `prefetch`, the next page is
+    requested while the caller processes the current one. The walk stops at
+    a short or empty page, or if the API repeats the previous page. Raises
+    RoverAPIError if a page cannot be fetched.
+    """
+    page = start_page
+    previous_names = None
+    pending = asyncio.ensure_future(get_groups(criteria, page, page_size, include_roles))
+    try:
+        while pending is not None:
+            response = await pending
+            pending = None
+            if "error" in response:
+                raise RoverAPIError(response)
+            
+            groups = response.get("groups", [])
+            names = [group.get("cn", "") for group in groups]
+            if not groups or names == previous_names:
+                return
+            previous_names = names
+            
+            page += 1
+            has_more = len(groups) >= page_size
+            if has_more and prefetch:
+                pending = asyncio.ensure_future(get_groups(criteria, page, page_size, include_roles))
+            yield groups
+            if has_more and pending is None:
+                pending = asyncio.ensure_future(get_groups(criteria, page, page_size, include_roles))
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+
+
+async def iter_groups(
+    criteria: str = None,
+    page_size: int = GROUPS_PAGE_SIZE,
+    include_roles: bool = False,
+    prefetch: bool = True,
+):
+    """Yield every group matching `criteria`, walking all pages of /groups."""
+    async for groups in iter_group_pages(criteria, page_size, include_roles, prefetch=prefetch):
+        for group in groups:
+            yield group
+
+
+def _encode_groups_cursor(criteria: str | None, page: int, page_size: int) -> str:
+    """Encode a groups listing position as an opaque cursor string."""
+    payload = json.dumps({"criteria": criteria, "page": page, "page_size": page_size})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_groups_cursor(cursor: str) -> dict[str, Any]:
+    """Decode a cursor produced by _encode_groups_cursor."""
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+@mcp.tool()
+@tool_scope
+async def list_groups_page(
+    criteria: str = None,
+    cursor: str = None,
+    page_size: int = GROUPS_PAGE_SIZE,
+    include_roles: bool = False,
+) -> dict[str, Any]:
+    """
+    Lists LDAP groups one page at a time using opaque cursors.
+    Pass the returned next_cursor back to fetch the following page; it is
+    null once the listing is exhausted.
+
+    Args:
+        criteria: Substring for matching group name
+        cursor: Cursor from a previous call (omit to start from the first page)
+        page_size: Number of groups per page
+        include_roles: Flag to include user-defined roles of group members
+        
+    Returns:
+        One page of groups and the cursor for the next page
+    """
+    page = 0
+    if cursor:
+        position = _decode_groups_cursor(cursor)
+        if position.get("criteria") != criteria:
+            raise ValueError("cursor was issued for different criteria")
+        page = position.get("page", 0)
+        page_size = position.get("page_size", page_size)
+    
+    response = await get_groups(criteria, page, page_size, include_roles)
+    if "error" in response:
+        return response
+    
+    groups = response.get("groups", [])
+    return {
+        "groups": groups,
+        "page": page,
+        "next_cursor": (
+            _encode_groups_cursor(criteria, page + 1, page_size) if len(groups) >= page_size else None
+        ),
+    }
+
+
 @mcp.tool()
+@tool_scope
 async def get_group_exclusions(group_name: str) -> dict[str, Any]:
     """
     Gets users that are exceptions for the specified group.
@@ -563,13 +2885,15 @@ async def get_group_exclusions(group_name: str) -> dict[str, Any]:
 
 
 @mcp.tool()
-async def get_group_owners(group_name: str) -> dict[str, Any]:
+@tool_scope
+async def get_group_owners(group_name: str, bypass_cache: bool = False) -> dict[str, Any]:
     """
     Gets the owners of the specified group.
     NOTE: Limited by API - returns 404, but kept for advanced tool dependencies.
 
     Args:
         group_name: The common name of the group (exact match)
+        bypass_cache: Fetch fresh data instead of using a cached response
         
     Returns:
         Group owners data from the Red Hat internal groups API
@@ -579,7 +2903,7 @@ async def get_group_owners(group_name: str) -> dict[str, Any]:
     
     url = f"{API_BASE_URL}/groups/{group_name}/owners"
     try:
-        response = await make_authenticated_request(url)
+        response = await make_authenticated_request(url, cache_ttl=CACHE_TTL_GROUPS, bypass_cache=bypass_cache)
         return response
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
@@ -595,6 +2919,7 @@ async def get_group_owners(group_name: str) -> dict[str, Any]:
 
 
 @mcp.tool()
+@tool_scope
 async def validate_group_name(group_name: str) -> dict[str, Any]:
     """
     Validates if a group name (cn) is valid.
@@ -629,13 +2954,15 @@ async def validate_group_name(group_name: str) -> dict[str, Any]:
 
 
 @mcp.tool()
-async def get_user_by_uid(uid: str) -> dict[str, Any]:
+@tool_scope
+async def get_user_by_uid(uid: str, bypass_cache: bool = False) -> dict[str, Any]:
     """
     Retrieves a user based on their UID.
     NOTE: Permission issues - returns 401, but kept for advanced tool dependencies.
 
     Args:
         uid: The UID of the user (exact match)
+        bypass_cache: Fetch fresh data instead of using a cached response
         
     Returns:
         User data from the Red Hat internal groups API
@@ -645,7 +2972,7 @@ async def get_user_by_uid(uid: str) -> dict[str, Any]:
     
     url = f"{API_BASE_URL}/users/{uid}"
     try:
-        response = await make_authenticated_request(url)
+        response = await make_authenticated_request(url, cache_ttl=CACHE_TTL_USERS, bypass_cache=bypass_cache)
         return response
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
@@ -661,13 +2988,15 @@ async def get_user_by_uid(uid: str) -> dict[str, Any]:
 
 
 @mcp.tool()
-async def get_user_groups(uid: str) -> dict[str, Any]:
+@tool_scope
+async def get_user_groups(uid: str, bypass_cache: bool = False) -> dict[str, Any]:
     """
     Retrieves all groups that a user is a member or owner of.
     NOTE: Permission issues - returns 401, but kept for advanced tool dependencies.
 
     Args:
         uid: The UID of the user (exact match)
+        bypass_cache: Fetch fresh data instead of using a cached response
         
     Returns:
         User groups data from the Red Hat internal groups API
@@ -675,11 +3004,24 @@ async def get_user_groups(uid: str) -> dict[str, Any]:
     if not uid:
         raise ValueError("uid is required")
     
+    # Answer from the local snapshot when it is fresh enough
+    store = None if bypass_cache else await fresh_snapshot_store()
+    if store is not None:
+        return {"groups": await store.user_groups(uid), "snapshot": await store.staleness()}
+    
     url = f"{API_BASE_URL}/users/{uid}/groups"
     try:
-        response = await make_authenticated_request(url)
+        response = await make_authenticated_request(url, cache_ttl=CACHE_TTL_USERS, bypass_cache=bypass_cache)
         return response
     except httpx.HTTPStatusError as e:
+        # The service account may not read user groups; answer from the
+        # membership index, which covers the groups loaded so far
+        if e.response.status_code in (401, 403) and MEMBERSHIP_INDEX.knows_user(uid):
+            return {
+                "groups": MEMBERSHIP_INDEX.groups_for(uid),
+                "source": "membership_index",
+                "indexed_groups": MEMBERSHIP_INDEX.stats()["groups"],
+            }
         if e.response.status_code == 404:
             return {"error": f"User '{uid}' not found or no groups"}
         elif e.response.status_code == 403:
@@ -692,9 +3034,232 @@ async def get_user_groups(uid: str) -> dict[str, Any]:
         return {"error": f"Request failed: {str(e)}"}
 
 
+@mcp.tool()
+@tool_scope
+async def backend_status() -> dict[str, Any]:
+    """
+    Report the health and load of the upstream backends.
+    
+    Returns:
+        Client certificate expiry and reload state, circuit breaker state, rate limiter queues and waits, retry counts,
+        response cache and request coalescing statistics for the groups API,
+        and the active JIRA backend with its circuit breaker state
+    """
+    rate_limits = {}
+    if _global_rate_limit is not None:
+        rate_limits["global"] = _global_rate_limit.stats()
+    for prefix, bucket in _endpoint_rate_limits.items():
+        rate_limits[prefix] = bucket.stats()
+    
+    try:
+        jira = {"backend": get_jira_backend().name}
+    except Exception as e:
+        jira = {"error": f"JIRA backend unavailable: {str(e)}"}
+    jira["circuit_breaker"] = _jira_breaker.status()
+    
+    return {
+        "rover_api": {
+            "base_url": API_BASE_URL,
+            "client_certificate": _client_certificate.status() if _uses_client_certificate() else None,
+            "circuit_breaker": _rover_breaker.status(),
+            "rate_limits": rate_limits,
+            "retries": dict(_retry_stats),
+            "response_cache": {
+                **_response_cache_stats,
+                "entries": len(_response_cache),
+                "bytes": _response_cache_bytes,
+            },
+            "coalesced_requests": _inflight_stats["coalesced"],
+        },
+        "jira": jira,
+    }
+
+
+@mcp.tool()
+@tool_scope
+async def server_metrics(prefix: str = "") -> dict[str, Any]:
+    """
+    Report the server's metrics: tool latencies, outcomes and fan-out, groups API
+    and JIRA request latencies, error counts by status and in-flight gauges.
+    The same metrics are served in the Prometheus format at /metrics in the
+    HTTP transports.
+
+    Args:
+        prefix: Only include metrics whose name starts with this prefix (e.g. "rover_tool_")
+        
+    Returns:
+        Metrics by name with their type, help text and labelled values; histograms are
+        summarized as count, sum, average and estimated p50/p95/p99
+    """
+    return {
+        "uptime_seconds": round(time.time() - _metrics_started, 1),
+        "metrics": METRICS.snapshot(prefix),
+    }
+
+
+def _busy_ms(intervals: list[tuple[int, int]]) -> float:
+    """Length of the union of (start_ns, end_ns) intervals in milliseconds."""
+    busy = 0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                busy += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        busy += current_end - current_start
+    return busy / 1e6
+
+
+def build_waterfall(spans: list[Span], max_rows: int = 200, bar_width: int = 40) -> dict[str, Any]:
+    """
+    Lay out a trace's spans by start time and find serialized work.
+
+    A span whose children barely overlap (their summed time is close to the
+    time they cover together) ran them one after another; the saving is what
+    running them concurrently could gain, bounded by the longest child.
+    """
+    by_parent = defaultdict(list)
+    span_ids = {span.span_id for span in spans}
+    for span in spans:
+        by_parent[span.parent_id if span.parent_id in span_ids else None].append(span)
+    for children in by_parent.values():
+        children.sort(key=lambda span: span.start_ns)
+
+    trace_start = min(span.start_ns for span in spans)
+    trace_end = max(span.end_ns or span.start_ns for span in spans)
+    scale = bar_width / max(trace_end - trace_start, 1)
+
+    rows = []
+    lines = []
+    serialized = []
+    hotspots = []
+    stack = [(span, 0) for span in reversed(by_parent[None])]
+    while stack:
+        span, depth = stack.pop()
+        children = by_parent.get(span.span_id, [])
+        stack.extend((child, depth + 1) for child in reversed(children))
+
+        end_ns = span.end_ns or span.start_ns
+        offset_ms = (span.start_ns - trace_start) / 1e6
+        intervals = [(child.start_ns, child.end_ns or child.start_ns) for child in children]
+        children_busy = _busy_ms(intervals)
+        self_ms = max(0.0, span.duration_ms - children_busy)
+        hotspots.append({"name": span.name, "span_id": span.span_id, "self_ms": round(self_ms, 3)})
+
+        if len(rows) < max_rows:
+            rows.append({
+                "name": span.name,
+                "span_id": span.span_id,
+                "depth": depth,
+                "offset_ms": round(offset_ms, 3),
+                "duration_ms": round(span.duration_ms, 3),
+                "self_ms": round(self_ms, 3),
+                "status": span.status,
+                "attributes": span.attributes,
+            })
+            start_col = int((span.start_ns - trace_start) * scale)
+            width = max(1, int((end_ns - span.start_ns) * scale))
+            bar = " " * start_col + "#" * width
+            lines.append(
+                f"{offset_ms:9.1f} {span.duration_ms:9.1f}ms |{bar:<{bar_width + 1}}| {'  ' * depth}{span.name}"
+            )
+
+        if len(children) >= 2:
+            children_sum = sum(child.duration_ms for child in children)
+            longest = max(child.duration_ms for child in children)
+            saving = children_busy - longest
+            if children_busy and children_sum / children_busy < 1.1 and saving >= max(1.0, 0.1 * span.duration_ms):
+                serialized.append({
+                    "name": span.name,
+                    "span_id": span.span_id,
+                    "children": len(children),
+                    "child_names": dict(Counter(child.name for child in children)),
+                    "children_busy_ms": round(children_busy, 3),
+                    "children_sum_ms": round(children_sum, 3),
+                    "parallelism": round(children_sum / children_busy, 2),
+                    "potential_saving_ms": round(saving, 3),
+                })
+
+    serialized.sort(key=lambda finding: finding["potential_saving_ms"], reverse=True)
+    hotspots.sort(key=lambda hotspot: hotspot["self_ms"], reverse=True)
+    return {
+        "duration_ms": round((trace_end - trace_start) / 1e6, 3),
+        "span_count": len(spans),
+        "spans": rows,
+        "waterfall": lines,
+        "serialized": serialized[:10],
+        "hotspots": hotspots[:5],
+    }
+
+
+@mcp.tool()
+@tool_scope
+async def trace_waterfall(trace_id: str = "", tool: str = "", max_rows: int = 200) -> dict[str, Any]:
+    """
+    Show a recorded trace as a waterfall of its spans (tool calls, helpers, groups API
+    requests, HTTP attempts and JIRA searches) and point out where work ran serially.
+
+    Args:
+        trace_id: Trace to show (default: the most recent finished trace)
+        tool: Show the most recent trace of this tool instead
+        max_rows: Maximum spans listed in the waterfall
+        
+    Returns:
+        The spans in start order with offsets, durations and attributes, a text
+        waterfall, spans whose children ran one after another with the time
+        concurrency could save, the spans with the most self time, and the
+        recently recorded traces
+    """
+    if _trace_buffer is None:
+        return {"error": "Tracing is disabled (TRACE_BUFFER_SIZE=0)"}
+    
+    # Only traces whose root span has finished; the call showing them is still running
+    finished = []
+    for candidate_id, trace in _trace_buffer.traces():
+        root = next((span for span in trace["spans"] if span.parent_id is None), None)
+        if root is not None:
+            finished.append((root, candidate_id, trace))
+    finished.sort(key=lambda item: item[0].end_ns)
+    recent = [
+        {
+            "trace_id": candidate_id,
+            "name": root.name,
+            "duration_ms": round(root.duration_ms, 3),
+            "spans": len(trace["spans"]),
+            "started": _iso_timestamp(root.start_ns / 1e9),
+        }
+        for root, candidate_id, trace in reversed(finished[-10:])
+    ]
+    
+    if trace_id:
+        selected = _trace_buffer.get(trace_id)
+    else:
+        selected = None
+        for root, _, trace in reversed(finished):
+            root_tool = root.attributes.get("rover.tool")
+            if root_tool == tool or (not tool and root_tool != "trace_waterfall"):
+                selected = trace
+                break
+    if selected is None:
+        return {"error": "No matching trace recorded", "recent_traces": recent}
+    
+    root = next((span for span in selected["spans"] if span.parent_id is None), selected["spans"][0])
+    return {
+        "trace_id": root.trace_id,
+        "root": root.name,
+        "dropped_spans": selected["dropped_spans"],
+        **build_waterfall(selected["spans"], max_rows=max_rows),
+        "recent_traces": recent,
+    }
+
+
 # Advanced Analytical Tools
 
 @mcp.tool()
+@tool_scope
 async def get_detailed_person_profile(uid: str, include_activity: bool = True) -> dict[str, Any]:
     """
     Get comprehensive person profile including rover groups, JIRA activity, and usage patterns.
@@ -733,7 +3298,8 @@ async def get_detailed_person_profile(uid: str, include_activity: bool = True) -
                 "total_groups": len(groups_data.get("groups", [])) if "groups" in groups_data else 0,
                 "groups": groups_data.get("groups", []),
                 "group_types": group_analysis.get("group_types", {}),
-                "access_level": group_analysis.get("access_level", "standard")
+                "access_level": group_analysis.get("access_level", "standard"),
+                "source": groups_data.get("source", "snapshot" if "snapshot" in groups_data else "api")
             },
             "jira_correlation": jira_activity,
             "activity_summary": {
@@ -751,9 +3317,13 @@ async def get_detailed_person_profile(uid: str, include_activity: bool = True) -
 
 
 @mcp.tool()
+@tool_scope
 async def find_company_group_usage_patterns(
     group_pattern: str = "sp-", 
-    restricted_access_only: bool = False
+    restricted_access_only: bool = False,
+    max_concurrency: int = 0,
+    max_groups: int | None = None,
+    ctx: Context | None = None
 ) -> dict[str, Any]:
     """
     Analyze rover group usage patterns across the company to identify widespread vs restricted groups.
@@ -761,65 +3331,88 @@ async def find_company_group_usage_patterns(
     Args:
         group_pattern: Pattern to match group names (e.g., "sp-" for SP groups)
         restricted_access_only: Focus only on groups with restricted access patterns
+        max_concurrency: Maximum groups analyzed in parallel (0 uses ANALYSIS_CONCURRENCY)
+        max_groups: Stop after analyzing this many groups (default ANALYSIS_MAX_GROUPS;
+            0 analyzes every matching group)
+        ctx: MCP context used to report per-group progress
         
     Returns:
         Analysis of group usage patterns and access restrictions
     """
+    if max_groups is None:
+        max_groups = ANALYSIS_MAX_GROUPS
     try:
-        # Search for groups matching the pattern
-        groups_data = await get_groups(criteria=group_pattern, count=100)
-        if "error" in groups_data:
-            return groups_data
-        
-        groups = groups_data.get("groups", [])
-        
         analysis = {
-            "total_groups_found": len(groups),
+            "total_groups_found": 0,
             "pattern_searched": group_pattern,
             "widespread_groups": [],
             "restricted_groups": [],
             "unused_groups": [],
             "access_analysis": {},
+            "failed_groups": [],
             "recommendations": []
         }
         
-        # Analyze each group
-        for group in groups:
+        # Read groups and owners from the local snapshot when it is fresh
+        store = await fresh_snapshot_store()
+        if store is not None:
+            analysis["snapshot"] = await store.staleness()
+        
+        async def analyze_group(group: dict) -> dict:
             group_name = group.get("cn", "")
             
             # Get group owners and members for analysis
-            owners_data = await get_group_owners(group_name)
+            if store is not None:
+                owners_data = owners_from_group(group)
+            else:
+                owners_data = await get_group_owners(group_name)
             
             # Analyze group characteristics
-            group_stats = await analyze_group_usage_characteristics(group_name, group, owners_data)
-            
-            # Categorize based on usage patterns
-            if group_stats.get("member_count", 0) > 50:
-                analysis["widespread_groups"].append({
-                    "name": group_name,
-                    "members": group_stats.get("member_count", 0),
-                    "usage_type": "company-wide"
-                })
-            elif group_stats.get("is_restricted", False) or restricted_access_only:
-                analysis["restricted_groups"].append({
-                    "name": group_name,
-                    "members": group_stats.get("member_count", 0),
-                    "restriction_type": group_stats.get("restriction_type", "unknown"),
-                    "jira_access": group_stats.get("has_jira_correlation", False)
-                })
-            elif group_stats.get("member_count", 0) < 5:
-                analysis["unused_groups"].append({
-                    "name": group_name,
-                    "members": group_stats.get("member_count", 0),
-                    "last_activity": group_stats.get("last_activity", "unknown")
-                })
+            return await analyze_group_usage_characteristics(group_name, group, owners_data)
+        
+        progress = ProgressReporter(ctx, max_groups or None)
+        
+        async def report_group(group: dict, group_stats: dict | Exception) -> None:
+            message, finding = describe_group_usage(group.get("cn", ""), group_stats)
+            await progress.advance(message, finding)
+        
+        # Stream every page of groups matching the pattern; each page is
+        # analyzed concurrently and results come back in input order
+        group_pages = (
+            store.iter_group_pages(group_pattern) if store is not None
+            else iter_group_pages(criteria=group_pattern)
+        )
+        try:
+            async with aclosing(group_pages) as pages:
+                async for page in pages:
+                    if max_groups:
+                        page = page[:max_groups - analysis["total_groups_found"]]
+                    analysis["total_groups_found"] += len(page)
+                    results = await run_bounded(
+                        page, analyze_group, max_concurrency or ANALYSIS_CONCURRENCY, on_result=report_group
+                    )
+                    
+                    for group, group_stats in zip(page, results):
+                        categorize_group_usage(analysis, group.get("cn", ""), group_stats, restricted_access_only)
+                    
+                    if max_groups and analysis["total_groups_found"] >= max_groups:
+                        break
+                    if deadline_exceeded():
+                        break
+        except RoverAPIError as e:
+            if not analysis["total_groups_found"]:
+                return e.payload
+            analysis["pagination_error"] = str(e)
+        await progress.finish(f"Analyzed {analysis['total_groups_found']} groups")
+        
+        total = analysis["total_groups_found"]
         
         # Generate insights
         analysis["access_analysis"] = {
-            "widespread_percentage": len(analysis["widespread_groups"]) / len(groups) * 100 if groups else 0,
-            "restricted_percentage": len(analysis["restricted_groups"]) / len(groups) * 100 if groups else 0,
+            "widespread_percentage": len(analysis["widespread_groups"]) / total * 100 if total else 0,
+            "restricted_percentage": len(analysis["restricted_groups"]) / total * 100 if total else 0,
             "potentially_unused": len(analysis["unused_groups"]),
-            "total_analyzed": len(groups)
+            "total_analyzed": total
         }
         
         analysis["recommendations"] = generate_group_usage_recommendations(analysis)
@@ -831,6 +3424,7 @@ async def find_company_group_usage_patterns(
 
 
 @mcp.tool()
+@tool_scope
 async def correlate_rover_groups_with_jira(
     group_name: str = None,
     analyze_all_members: bool = False
@@ -849,19 +3443,19 @@ async def correlate_rover_groups_with_jira(
         raise ValueError("group_name is required for correlation analysis")
     
     try:
-        # Get group information
-        group_data = await rover_group(group_name)
+        # Get group information and owners together
+        group_data, owners_data = await asyncio.gather(
+            rover_group(group_name), get_group_owners(group_name)
+        )
         if "error" in group_data:
             return group_data
         
-        # Get group owners
-        owners_data = await get_group_owners(group_name)
-        
         correlation = {
             "group_name": group_name,
             "group_info": group_data,
             "jira_correlation": {
                 "owners_jira_activity": {},
+                "failed_owners": [],
                 "common_projects": [],
                 "access_patterns": {},
                 "team_effectiveness": {}
@@ -870,13 +3464,30 @@ async def correlate_rover_groups_with_jira(
             "recommendations": []
         }
         
-        # Analyze owners' JIRA activity
+        # Analyze owners' JIRA activity in batches run in parallel; an owner
+        # whose search is slow or fails is recorded in failed_owners rather
+        # than blocking the correlation or the rest of their batch
         if "owners" in owners_data and not "error" in owners_data:
-            for owner in owners_data.get("owners", []):
-                owner_uid = owner.get("uid", "")
-                if owner_uid:
-                    jira_activity = await analyze_member_jira_activity(owner_uid)
-                    correlation["jira_correlation"]["owners_jira_activity"][owner_uid] = jira_activity
+            owner_uids = list(dict.fromkeys(
+                owner.get("uid", "") for owner in owners_data.get("owners", []) if owner.get("uid", "")
+            ))
+            batches = [
+                owner_uids[start:start + JIRA_BATCH_SIZE]
+                for start in range(0, len(owner_uids), max(1, JIRA_BATCH_SIZE))
+            ]
+            results = await run_bounded(
+                batches, lambda batch: analyze_members_jira_activity(batch, timeout=MEMBER_ANALYSIS_TIMEOUT)
+            )
+            for batch, batch_activity in zip(batches, results):
+                if isinstance(batch_activity, Exception):
+                    batch_activity = {owner_uid: {"error": str(batch_activity)} for owner_uid in batch}
+                for owner_uid, jira_activity in batch_activity.items():
+                    if "error" in jira_activity:
+                        correlation["jira_correlation"]["failed_owners"].append(
+                            {"uid": owner_uid, "error": jira_activity["error"]}
+                        )
+                    else:
+                        correlation["jira_correlation"]["owners_jira_activity"][owner_uid] = jira_activity
         
         # Find common JIRA projects across group members
         correlation["jira_correlation"]["common_projects"] = await find_common_jira_projects(
@@ -899,9 +3510,12 @@ async def correlate_rover_groups_with_jira(
 
 
 @mcp.tool()
+@tool_scope
 async def find_unused_accounts_and_teams(
     inactive_threshold_days: int = 365,
-    min_group_size: int = 2
+    min_group_size: int = 2,
+    max_groups: int | None = None,
+    ctx: Context | None = None
 ) -> dict[str, Any]:
     """
     Identify rover accounts and teams that haven't been used for a specified time period.
@@ -909,68 +3523,82 @@ async def find_unused_accounts_and_teams(
     Args:
         inactive_threshold_days: Number of days to consider as inactive threshold
         min_group_size: Minimum group size to consider for team analysis
+        max_groups: Stop after analyzing this many groups (default ANALYSIS_MAX_GROUPS;
+            0 analyzes every group)
+        ctx: MCP context used to report per-group progress and findings
         
     Returns:
         Analysis of unused accounts and teams with recommendations for cleanup
     """
+    if max_groups is None:
+        max_groups = ANALYSIS_MAX_GROUPS
     try:
-        # Get all groups for analysis
-        groups_data = await get_groups(count=200)  # Get a large sample
-        if "error" in groups_data:
-            return groups_data
-        
         analysis = {
             "inactive_threshold_days": inactive_threshold_days,
             "analysis_date": "2024-current",
             "unused_accounts": [],
             "unused_teams": [],
             "dormant_groups": [],
+            "failed_groups": [],
             "activity_statistics": {},
             "cleanup_recommendations": []
         }
+        total_groups = 0
         
-        groups = groups_data.get("groups", [])
+        # Read groups and owners from the local snapshot when it is fresh
+        store = await fresh_snapshot_store()
+        if store is not None:
+            analysis["snapshot"] = await store.staleness()
         
-        # Analyze each group for usage patterns
-        for group in groups:
-            group_name = group.get("cn", "")
-            
-            # Get group details
-            group_analysis = await analyze_group_activity_level(group_name, inactive_threshold_days)
-            
-            # Categorize based on activity
-            if group_analysis.get("is_unused", False):
-                if group_analysis.get("member_count", 0) >= min_group_size:
-                    analysis["unused_teams"].append({
-                        "group_name": group_name,
-                        "member_count": group_analysis.get("member_count", 0),
-                        "last_activity": group_analysis.get("last_activity", "unknown"),
-                        "days_inactive": group_analysis.get("days_inactive", 0)
-                    })
-                else:
-                    analysis["dormant_groups"].append({
-                        "group_name": group_name,
-                        "member_count": group_analysis.get("member_count", 0),
-                        "reason": "below_minimum_size"
-                    })
-            
-            # Check for individual inactive accounts within active groups
-            if not group_analysis.get("is_unused", False):
-                inactive_members = group_analysis.get("inactive_members", [])
-                for member in inactive_members:
-                    analysis["unused_accounts"].append({
-                        "uid": member.get("uid", ""),
-                        "group": group_name,
-                        "last_seen": member.get("last_seen", "unknown"),
-                        "days_inactive": member.get("days_inactive", 0)
-                    })
+        async def analyze_group(group: dict) -> dict:
+            owners_data = owners_from_group(group) if store is not None else None
+            return await analyze_group_activity_level(group.get("cn", ""), inactive_threshold_days, owners_data)
+        
+        progress = ProgressReporter(ctx, max_groups or None)
+        
+        async def report_group(group: dict, group_analysis: dict | Exception) -> None:
+            message, finding = describe_group_activity(group.get("cn", ""), group_analysis)
+            await progress.advance(message, finding)
+        
+        # Stream every page of groups; each page is analyzed concurrently
+        group_pages = store.iter_group_pages() if store is not None else iter_group_pages()
+        try:
+            async with aclosing(group_pages) as pages:
+                async for page in pages:
+                    if max_groups:
+                        page = page[:max_groups - total_groups]
+                    total_groups += len(page)
+                    results = await run_bounded(page, analyze_group, on_result=report_group)
+                    
+                    for group, group_analysis in zip(page, results):
+                        # Groups the deadline cut off are listed like in
+                        # find_company_group_usage_patterns
+                        if isinstance(group_analysis, DeadlineExceeded):
+                            analysis["failed_groups"].append(
+                                {"name": group.get("cn", ""), "error": str(group_analysis)}
+                            )
+                            continue
+                        if isinstance(group_analysis, Exception):
+                            raise group_analysis
+                        categorize_group_activity(analysis, group.get("cn", ""), group_analysis, min_group_size)
+                    
+                    if max_groups and total_groups >= max_groups:
+                        break
+                    if deadline_exceeded():
+                        break
+        except RoverAPIError as e:
+            if not total_groups:
+                return e.payload
+            analysis["pagination_error"] = str(e)
+        await progress.finish(f"Analyzed {total_groups} groups")
         
         # Generate statistics
         analysis["activity_statistics"] = {
-            "total_groups_analyzed": len(groups),
+            "total_groups_analyzed": total_groups,
             "unused_teams_count": len(analysis["unused_teams"]),
             "unused_accounts_count": len(analysis["unused_accounts"]),
             "dormant_groups_count": len(analysis["dormant_groups"]),
+            "failed_groups_count": len(analysis["failed_groups"]),
             "cleanup_potential": calculate_cleanup_potential(analysis)
         }
         
@@ -985,6 +3613,7 @@ async def find_unused_accounts_and_teams(
 
 # Helper functions for the analytical tools
 
+@traced
 async def analyze_user_group_patterns(uid: str, groups_data: dict) -> dict:
     """Analyze patterns in user's group memberships."""
     try:
@@ -1063,6 +3692,7 @@ def generate_user_recommendations(user_data: dict, groups_data: dict, jira_activ
     return recommendations
 
 
+@traced
 async def analyze_group_usage_characteristics(group_name: str, group_data: dict, owners_data: dict) -> dict:
     """Analyze characteristics of a group's usage patterns."""
     try:
@@ -1087,16 +3717,14 @@ async def analyze_group_usage_characteristics(group_name: str, group_data: dict,
             characteristics["is_restricted"] = True
             characteristics["restriction_type"] = "access_controlled"
         
-        # Check for JIRA correlation by analyzing owners
+        # Check for JIRA correlation with one batched search over all owners
         if "owners" in owners_data and not "error" in owners_data:
-            for owner in owners_data.get("owners", []):
-                owner_uid = owner.get("uid", "")
-                if owner_uid:
-                    # Quick check for JIRA activity
-                    jira_activity = await analyze_member_jira_activity(owner_uid)
-                    if jira_activity.get("total_issues", 0) > 0:
-                        characteristics["has_jira_correlation"] = True
-                        break
+            owner_uids = [owner.get("uid", "") for owner in owners_data.get("owners", []) if owner.get("uid", "")]
+            if owner_uids:
+                owners_activity = await analyze_members_jira_activity(owner_uids)
+                characteristics["has_jira_correlation"] = any(
+                    activity.get("total_issues", 0) > 0 for activity in owners_activity.values()
+                )
         
         return characteristics
         
@@ -1110,6 +3738,46 @@ async def analyze_group_usage_characteristics(group_name: str, group_data: dict,
         }
 
 
+def describe_group_usage(group_name: str, group_stats: dict | Exception) -> tuple[str, bool]:
+    """Summarize one group's usage for a progress message; the flag marks findings."""
+    if isinstance(group_stats, Exception):
+        return f"{group_name}: not analyzed ({group_stats})", False
+    members = group_stats.get("member_count", 0)
+    if group_stats.get("is_restricted", False):
+        return f"{group_name}: restricted ({group_stats.get('restriction_type', 'unknown')}), {members} members", True
+    return f"{group_name}: {members} members", False
+
+
+def categorize_group_usage(
+    analysis: dict, group_name: str, group_stats: dict | Exception, restricted_access_only: bool
+) -> None:
+    """Place one analyzed group into the usage categories of `analysis`."""
+    if isinstance(group_stats, Exception):
+        analysis["failed_groups"].append({"name": group_name, "error": str(group_stats)})
+        return
+    
+    # Categorize based on usage patterns
+    if group_stats.get("member_count", 0) > 50:
+        analysis["widespread_groups"].append({
+            "name": group_name,
+            "members": group_stats.get("member_count", 0),
+            "usage_type": "company-wide"
+        })
+    elif group_stats.get("is_restricted", False) or restricted_access_only:
+        analysis["restricted_groups"].append({
+            "name": group_name,
+            "members": group_stats.get("member_count", 0),
+            "restriction_type": group_stats.get("restriction_type", "unknown"),
+            "jira_access": group_stats.get("has_jira_correlation", False)
+        })
+    elif group_stats.get("member_count", 0) < 5:
+        analysis["unused_groups"].append({
+            "name": group_name,
+            "members": group_stats.get("member_count", 0),
+            "last_activity": group_stats.get("last_activity", "unknown")
+        })
+
+
 def generate_group_usage_recommendations(analysis: dict) -> list:
     """Generate recommendations based on group usage analysis."""
     recommendations = []
@@ -1126,6 +3794,7 @@ def generate_group_usage_recommendations(analysis: dict) -> list:
     return recommendations
 
 
+@traced
 async def find_common_jira_projects(owners_jira_activity: dict) -> list:
     """Find common JIRA projects across group owners."""
     project_counts = {}
@@ -1145,6 +3814,7 @@ async def find_common_jira_projects(owners_jira_activity: dict) -> list:
     return sorted(common_projects, key=lambda x: x["owner_count"], reverse=True)
 
 
+@traced
 async def analyze_group_jira_access_patterns(group_name: str, owners_jira_activity: dict) -> dict:
     """Analyze JIRA access patterns for a rover group."""
     patterns = {
@@ -1212,8 +3882,11 @@ def generate_rover_jira_recommendations(correlation: dict) -> list:
     return recommendations
 
 
-async def analyze_group_activity_level(group_name: str, inactive_threshold_days: int) -> dict:
-    """Analyze activity level of a specific group."""
+@traced
+async def analyze_group_activity_level(
+    group_name: str, inactive_threshold_days: int, owners_data: dict | None = None
+) -> dict:
+    """Analyze activity level of a specific group, fetching owners unless given."""
     try:
         analysis = {
             "is_unused": False,
@@ -1224,21 +3897,21 @@ async def analyze_group_activity_level(group_name: str, inactive_threshold_days:
         }
         
         # Get group owners for basic activity indicators
-        owners_data = await get_group_owners(group_name)
+        if owners_data is None:
+            owners_data = await get_group_owners(group_name)
         
         if "owners" in owners_data and not "error" in owners_data:
             owners = owners_data.get("owners", [])
             analysis["member_count"] = len(owners)  # Approximate with owners
             
-            # Check if any owners have recent JIRA activity
+            # Check if any owners have recent JIRA activity with one batched search
             recent_activity = False
-            for owner in owners:
-                owner_uid = owner.get("uid", "")
-                if owner_uid:
-                    jira_activity = await analyze_member_jira_activity(owner_uid)
-                    if jira_activity.get("total_issues", 0) > 0:
-                        recent_activity = True
-                        break
+            owner_uids = [owner.get("uid", "") for owner in owners if owner.get("uid", "")]
+            if owner_uids:
+                owners_activity = await analyze_members_jira_activity(owner_uids)
+                recent_activity = any(
+                    activity.get("total_issues", 0) > 0 for activity in owners_activity.values()
+                )
             
             if not recent_activity and len(owners) < 3:
                 analysis["is_unused"] = True
@@ -1260,6 +3933,50 @@ async def analyze_group_activity_level(group_name: str, inactive_threshold_days:
         }
 
 
+def describe_group_activity(group_name: str, group_analysis: dict | Exception) -> tuple[str, bool]:
+    """Summarize one group's activity for a progress message; the flag marks findings."""
+    if isinstance(group_analysis, Exception):
+        return f"{group_name}: not analyzed ({group_analysis})", False
+    if group_analysis.get("is_unused", False):
+        return f"{group_name}: unused for {group_analysis.get('days_inactive', 0)} days", True
+    inactive_members = group_analysis.get("inactive_members", [])
+    if inactive_members:
+        return f"{group_name}: {len(inactive_members)} inactive accounts", True
+    return f"{group_name}: active", False
+
+
+def categorize_group_activity(
+    analysis: dict, group_name: str, group_analysis: dict, min_group_size: int
+) -> None:
+    """Record one group's activity findings in the unused accounts analysis."""
+    # Categorize based on activity
+    if group_analysis.get("is_unused", False):
+        if group_analysis.get("member_count", 0) >= min_group_size:
+            analysis["unused_teams"].append({
+                "group_name": group_name,
+                "member_count": group_analysis.get("member_count", 0),
+                "last_activity": group_analysis.get("last_activity", "unknown"),
+                "days_inactive": group_analysis.get("days_inactive", 0)
+            })
+        else:
+            analysis["dormant_groups"].append({
+                "group_name": group_name,
+                "member_count": group_analysis.get("member_count", 0),
+                "reason": "below_minimum_size"
+            })
+    
+    # Check for individual inactive accounts within active groups
+    if not group_analysis.get("is_unused", False):
+        inactive_members = group_analysis.get("inactive_members", [])
+        for member in inactive_members:
+            analysis["unused_accounts"].append({
+                "uid": member.get("uid", ""),
+                "group": group_name,
+                "last_seen": member.get("last_seen", "unknown"),
+                "days_inactive": member.get("days_inactive", 0)
+            })
+
+
 def calculate_cleanup_potential(analysis: dict) -> dict:
     """Calculate potential for cleanup based on unused accounts analysis."""
     return {
@@ -1288,7 +4005,434 @@ def generate_cleanup_recommendations(analysis: dict) -> list:
     return recommendations
 
 
+# Membership index
+
+class MembershipIndex:
+    """
+    In-memory reverse index of group membership.
+
+    Maps each uid to the groups it owns or belongs to, and each group to its
+    principals, so user-to-groups lookups and cross-group set operations never
+    refetch group documents. Built from group payloads seen by rover_group and
+    the snapshot sync, so it only covers groups that have been loaded.
+    """
+
+    def __init__(self):
+        self._by_uid: dict[str, dict[str, set[str]]] = defaultdict(dict)
+        self._by_group: dict[str, dict[str, set[str]]] = {}
+
+    def add_group(self, cn: str, payload: dict) -> None:
+        """Index a group's owners and members, replacing any previous entry."""
+        principals = defaultdict(set)
+        for owner in payload.get("owners", []):
+            if _principal_id(owner):
+                principals[_principal_id(owner)].add("owner")
+        for member in payload.get("members", []):
+            if _principal_id(member):
+                principals[_principal_id(member)].add("member")
+        
+        self.remove_group(cn)
+        self._by_group[cn] = dict(principals)
+        for uid, roles in principals.items():
+            self._by_uid[uid][cn] = roles
+
+    def clear(self) -> None:
+        self._by_uid.clear()
+        self._by_group.clear()
+
+    def remove_group(self, cn: str) -> None:
+        for uid in self._by_group.pop(cn, {}):
+            groups = self._by_uid.get(uid)
+            if groups is not None:
+                groups.pop(cn, None)
+                if not groups:
+                    del self._by_uid[uid]
+
+    def __contains__(self, cn: str) -> bool:
+        return cn in self._by_group
+
+    def knows_user(self, uid: str) -> bool:
+        return uid in self._by_uid
+
+    def groups_for(self, uid: str) -> list[dict]:
+        """Return the indexed groups of a user in get_user_groups format."""
+        return [
+            {"cn": cn, "name": cn, "role": "owner" if "owner" in roles else "member", "roles": sorted(roles)}
+            for cn, roles in sorted(self._by_uid.get(uid, {}).items())
+        ]
+
+    def members(self, cn: str, role: str | None = None) -> set[str]:
+        """Return the uids in a group, optionally only those holding `role`."""
+        principals = self._by_group.get(cn, {})
+        if role is None:
+            return set(principals)
+        return {uid for uid, roles in principals.items() if role in roles}
+
+    def intersection(self, cns: list[str], role: str | None = None) -> set[str]:
+        sets = [self.members(cn, role) for cn in cns]
+        return set.intersection(*sets) if sets else set()
+
+    def union(self, cns: list[str], role: str | None = None) -> set[str]:
+        return set().union(*(self.members(cn, role) for cn in cns))
+
+    def difference(self, cn: str, others: list[str], role: str | None = None) -> set[str]:
+        return self.members(cn, role) - self.union(others, role)
+
+    def stats(self) -> dict[str, int]:
+        return {"groups": len(self._by_group), "users": len(self._by_uid)}
+
+
+MEMBERSHIP_INDEX = MembershipIndex()
+
+
+@mcp.tool()
+@tool_scope
+async def compare_group_memberships(group_names: list[str], role: str = "") -> dict[str, Any]:
+    """
+    Compare the memberships of several groups using the membership index.
+    
+    Args:
+        group_names: Groups to compare (fetched and indexed if not yet known)
+        role: Only compare principals with this role ("owner" or "member"); empty compares everyone
+        
+    Returns:
+        Members common to all groups, the union size, and members exclusive to each group
+    """
+    if not group_names:
+        raise ValueError("group_names is required")
+    
+    names = list(dict.fromkeys(group_names))
+    role = role or None
+    
+    try:
+        # Fetch any groups the index has not seen yet; rover_group indexes them
+        await run_bounded([cn for cn in names if cn not in MEMBERSHIP_INDEX], rover_group)
+        
+        found = [cn for cn in names if cn in MEMBERSHIP_INDEX]
+        return {
+            "groups": {cn: len(MEMBERSHIP_INDEX.members(cn, role)) for cn in found},
+            "missing_groups": [cn for cn in names if cn not in MEMBERSHIP_INDEX],
+            "common_members": sorted(MEMBERSHIP_INDEX.intersection(found, role)),
+            "union_count": len(MEMBERSHIP_INDEX.union(found, role)),
+            "exclusive_members": {
+                cn: sorted(MEMBERSHIP_INDEX.difference(cn, [other for other in found if other != cn], role))
+                for cn in found
+            },
+        }
+    except Exception as e:
+        return {"error": f"Failed to compare group memberships: {str(e)}"}
+
+
+# Local group snapshot
+
+SNAPSHOT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS groups (
+    cn TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS group_owners (
+    group_cn TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    PRIMARY KEY (group_cn, uid)
+);
+CREATE TABLE IF NOT EXISTS group_members (
+    group_cn TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    member_type TEXT,
+    PRIMARY KEY (group_cn, uid)
+);
+CREATE INDEX IF NOT EXISTS idx_group_owners_uid ON group_owners (uid);
+CREATE INDEX IF NOT EXISTS idx_group_members_uid ON group_members (uid);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _principal_id(principal: dict) -> str:
+    """Return the uid of an owner or member entry (the API uses id or uid)."""
+    return principal.get("id") or principal.get("uid") or ""
+
+
+class SnapshotStore(SQLiteAccess):
+    """SQLite snapshot of groups, owners, members and user-to-group edges."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.executescript(SNAPSHOT_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        self._close()
+
+    async def validators(self, cn: str) -> tuple[str | None, str | None]:
+        """Return the stored ETag and Last-Modified values for a group."""
+        def query(conn):
+            row = conn.execute("SELECT etag, last_modified FROM groups WHERE cn = ?", (cn,)).fetchone()
+            return (row["etag"], row["last_modified"]) if row else (None, None)
+        return await self._run(query)
+
+    async def store_group(
+        self, cn: str, payload: dict, etag: str | None, last_modified: str | None, synced_at: float
+    ) -> None:
+        """Replace a group's document and its owner and member edges."""
+        def write(conn):
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO groups VALUES (?, ?, ?, ?, ?)",
+                    (cn, json.dumps(payload), etag, last_modified, synced_at),
+                )
+                conn.execute("DELETE FROM group_owners WHERE group_cn = ?", (cn,))
+                conn.execute("DELETE FROM group_members WHERE group_cn = ?", (cn,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO group_owners VALUES (?, ?)",
+                    [(cn, _principal_id(o)) for o in payload.get("owners", []) if _principal_id(o)],
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO group_members VALUES (?, ?, ?)",
+                    [
+                        (cn, _principal_id(m), m.get("type"))
+                        for m in payload.get("members", []) if _principal_id(m)
+                    ],
+                )
+        await self._run(write)
+
+    async def touch_groups(self, cns: list[str], synced_at: float) -> None:
+        """Mark unchanged groups as seen by the current sync."""
+        def write(conn):
+            with conn:
+                conn.executemany("UPDATE groups SET synced_at = ? WHERE cn = ?", [(synced_at, cn) for cn in cns])
+        if cns:
+            await self._run(write)
+
+    async def prune(self, before: float) -> list[str]:
+        """Delete groups not seen by a sync started at `before` and return their names."""
+        def write(conn):
+            with conn:
+                removed = [row["cn"] for row in conn.execute("SELECT cn FROM groups WHERE synced_at < ?", (before,))]
+                stale = "SELECT cn FROM groups WHERE synced_at < ?"
+                conn.execute(f"DELETE FROM group_owners WHERE group_cn IN ({stale})", (before,))
+                conn.execute(f"DELETE FROM group_members WHERE group_cn IN ({stale})", (before,))
+                conn.execute("DELETE FROM groups WHERE synced_at < ?", (before,))
+                return removed
+        return await self._run(write)
+
+    async def set_meta(self, key: str, value: Any) -> None:
+        def write(conn):
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, json.dumps(value)))
+        await self._run(write)
+
+    async def get_meta(self, key: str, default: Any = None) -> Any:
+        def query(conn):
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            return json.loads(row["value"]) if row else default
+        return await self._run(query)
+
+    async def staleness(self) -> dict[str, Any]:
+        """Describe how old the snapshot is, for inclusion in tool responses."""
+        last_sync = await self.get_meta("last_sync")
+        if last_sync is None:
+            return {"source": "snapshot", "synced_at": None, "age_seconds": None, "stale": True}
+        age = max(0.0, time.time() - last_sync)
+        return {
+            "source": "snapshot",
+            "synced_at": _iso_timestamp(last_sync),
+            "age_seconds": round(age),
+            "stale": age > SNAPSHOT_MAX_AGE,
+        }
+
+    async def last_attempt(self) -> str | None:
+        """When the latest sync pass started, whether or not it completed cleanly."""
+        return _iso_timestamp(await self.get_meta("last_attempt"))
+
+    async def user_groups(self, uid: str) -> list[dict]:
+        """Return the groups a user owns or belongs to, with their roles."""
+        def query(conn):
+            rows = conn.execute(
+                "SELECT group_cn, 'owner' AS role FROM group_owners WHERE uid = ? "
+                "UNION ALL SELECT group_cn, 'member' AS role FROM group_members WHERE uid = ? "
+                "ORDER BY group_cn",
+                (uid, uid),
+            ).fetchall()
+            groups = {}
+            for row in rows:
+                groups.setdefault(row["group_cn"], []).append(row["role"])
+            return [
+                {"cn": cn, "name": cn, "role": "owner" if "owner" in roles else "member", "roles": roles}
+                for cn, roles in groups.items()
+            ]
+        return await self._run(query)
+
+    async def iter_group_pages(self, criteria: str = None, page_size: int = GROUPS_PAGE_SIZE):
+        """Yield pages of stored group documents whose name contains `criteria`."""
+        pattern = re.sub(r"([\\%_])", r"\\\1", criteria or "")
+        def query(conn, after):
+            rows = conn.execute(
+                "SELECT cn, payload FROM groups WHERE cn > ? AND cn LIKE ? ESCAPE '\\' ORDER BY cn LIMIT ?",
+                (after, f"%{pattern}%", page_size),
+            ).fetchall()
+            return [{"cn": row["cn"], **json.loads(row["payload"])} for row in rows]
+        after = ""
+        while True:
+            page = await self._run(query, after)
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            after = page[-1]["cn"]
+
+
+_snapshot_store: SnapshotStore | None = None
+
+
+def get_snapshot_store() -> SnapshotStore | None:
+    """Return the configured snapshot store, or None when SNAPSHOT_DB is unset."""
+    global _snapshot_store
+
+    if _snapshot_store is None and SNAPSHOT_DB:
+        _snapshot_store = SnapshotStore(SNAPSHOT_DB)
+    return _snapshot_store
+
+
+async def fresh_snapshot_store() -> SnapshotStore | None:
+    """Return the snapshot store if it has synced within SNAPSHOT_MAX_AGE."""
+    store = get_snapshot_store()
+    if store is None:
+        return None
+    staleness = await store.staleness()
+    return None if staleness["stale"] else store
+
+
+def owners_from_group(group: dict) -> dict[str, Any]:
+    """Build a get_group_owners-style response from a stored group document."""
+    return {"owners": [{"uid": _principal_id(owner)} for owner in group.get("owners", []) if _principal_id(owner)]}
+
+
+@traced
+async def sync_group_snapshot(store: SnapshotStore) -> dict[str, Any]:
+    """
+    Bring the snapshot up to date with the groups API.
+
+    Every listed group is revalidated with its stored ETag/Last-Modified, so
+    unchanged groups cost a 304 with no body. Groups missing from a complete
+    listing are removed from the snapshot. Only a pass in which every group
+    synced advances last_sync (and so the snapshot's freshness); every pass
+    records last_attempt.
+    """
+    started = time.time()
+    await store.set_meta("last_attempt", started)
+    stats = {"listed": 0, "updated": 0, "unchanged": 0, "failed": 0, "removed": 0}
+
+    async def sync_group(group: dict) -> str:
+        cn = group.get("cn", "")
+        url = f"{API_BASE_URL}/groups/{cn}"
+        etag, last_modified = await store.validators(cn)
+        response = await _conditional_get(url, etag=etag, last_modified=last_modified)
+        if response.status_code == 304:
+            return "unchanged"
+        response.raise_for_status()
+        payload = response.json()
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        await store.store_group(cn, payload, etag, last_modified, started)
+        # Seed the response cache so rover_group serves or revalidates this copy
+        _cache_store(
+            _cache_key(url, None), 200, payload, "", len(response.content), CACHE_TTL_GROUPS, etag, last_modified
+        )
+        MEMBERSHIP_INDEX.add_group(cn, payload)
+        return "updated"
+
+    async with aclosing(iter_group_pages()) as pages:
+        async for page in pages:
+            stats["listed"] += len(page)
+            results = await run_bounded(page, sync_group)
+            unchanged = []
+            for group, result in zip(page, results):
+                if isinstance(result, Exception):
+                    stats["failed"] += 1
+                else:
+                    stats[result] += 1
+                    if result == "unchanged":
+                        unchanged.append(group.get("cn", ""))
+            await store.touch_groups(unchanged, started)
+
+    # Only prune and mark the snapshot fresh after a clean pass, otherwise
+    # failed groups would be dropped or served as current
+    if not stats["failed"]:
+        removed = await store.prune(started)
+        for cn in removed:
+            MEMBERSHIP_INDEX.remove_group(cn)
+        stats["removed"] = len(removed)
+        await store.set_meta("last_sync", started)
+    stats["duration_seconds"] = round(time.time() - started, 3)
+    await store.set_meta("last_sync_stats", stats)
+    return stats
+
+
+async def snapshot_sync_loop(store: SnapshotStore) -> None:
+    """Background job re-syncing the snapshot every SNAPSHOT_SYNC_INTERVAL seconds."""
+    # Serve reverse lookups from the previous run's snapshot until the first sync lands
+    try:
+        async with aclosing(store.iter_group_pages()) as pages:
+            async for page in pages:
+                for group in page:
+                    MEMBERSHIP_INDEX.add_group(group["cn"], group)
+    except Exception as e:
+        print(f"Loading membership index from snapshot failed: {e}", file=sys.stderr)
+    
+    while True:
+        try:
+            await sync_group_snapshot(store)
+        except Exception as e:
+            print(f"Snapshot sync failed: {e}", file=sys.stderr)
+        await asyncio.sleep(SNAPSHOT_SYNC_INTERVAL)
+
+
+@mcp.tool()
+@tool_scope
+async def group_snapshot_status(sync_now: bool = False) -> dict[str, Any]:
+    """
+    Report the state of the local group snapshot, optionally syncing it first.
+
+    Args:
+        sync_now: Run an incremental sync before reporting
+        
+    Returns:
+        Snapshot age, last sync statistics and whether tools are answering from it
+    """
+    store = get_snapshot_store()
+    if store is None:
+        return {"error": "Group snapshot is disabled (set SNAPSHOT_DB)"}
+    
+    try:
+        if sync_now:
+            await sync_group_snapshot(store)
+        staleness = await store.staleness()
+        return {
+            "path": store.path,
+            "snapshot": staleness,
+            "serving_tools": not staleness["stale"],
+            "last_attempt_at": await store.last_attempt(),
+            "last_sync_stats": await store.get_meta("last_sync_stats", {}),
+        }
+    except Exception as e:
+        return {"error": f"Snapshot sync failed: {str(e)}"}
+
+
 @mcp.tool()
+@tool_scope
 async def rover_integration_help() -> dict[str, Any]:
     """
     Get help information about the rover-JIRA integration tools.
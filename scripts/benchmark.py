@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of the MCP tools against the local groups API mock.
+
+For each scale a synthetic org and JIRA fixture are generated
+(scripts/synthetic_org.py) and served by the mock groups API
+(scripts/mock_groups_api.py), then every tool is called repeatedly in its
+own worker process so peak RSS is per tool. Reports p50/p95/p99 latency, upstream
+requests per call and peak RSS, and compares them with a stored baseline.
+
+Usage:
+    python scripts/benchmark.py --scales small,medium
+    python scripts/benchmark.py --latency-ms 50 --error-rate 0.02 --no-compare
+    python scripts/benchmark.py --update-baseline
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+sys.path.insert(0, REPO_ROOT)
+
+SCALES = {
+    "small": {"groups": 100, "users": 500},
+    "medium": {"groups": 1000, "users": 5000},
+    "large": {"groups": 5000, "users": 25000},
+    "huge": {"groups": 30000, "users": 100000},
+}
+
+# Server settings for the runs: the client-side rate limit and tool deadline
+# are disabled so the numbers measure the tools, not the configured limits
+BENCHMARK_ENV = {
+    "RATE_LIMIT_RPS": "0",
+    "TOOL_DEADLINE": "0",
+    "SNAPSHOT_DB": "",
+    "JIRA_BACKEND": "fixture",
+}
+
+# Extra server settings per tool, built from the scale's work directory
+SCENARIO_ENV = {
+    # Times incremental syncs: the untimed first call fills the snapshot
+    "group_snapshot_status": lambda workdir: {"SNAPSHOT_DB": os.path.join(workdir, "snapshot.db")},
+}
+
+# Tool name -> (arguments built from the mock's /_org sample, walks many groups)
+SCENARIOS = {
+    "rover_integration_help": (lambda sample: {}, False),
+    "backend_status": (lambda sample: {}, False),
+    "group_snapshot_status": (lambda sample: {"sync_now": True}, True),
+    "server_metrics": (lambda sample: {}, False),
+    # A worker runs one tool, so the only traces recorded are its own
+    "trace_waterfall": (lambda sample: {"tool": "trace_waterfall"}, False),
+    "rover_group": (lambda sample: {"group_name": sample["sample_group"]}, False),
+    "get_groups": (lambda sample: {"criteria": "sp-"}, False),
+    "list_groups_page": (lambda sample: {"criteria": "sp-"}, False),
+    "get_group_exclusions": (lambda sample: {"group_name": sample["sample_group"]}, False),
+    "get_group_owners": (lambda sample: {"group_name": sample["sample_group"]}, False),
+    "validate_group_name": (lambda sample: {"group_name": "sp-benchmark-new"}, False),
+    "get_user_by_uid": (lambda sample: {"uid": sample["sample_uid"]}, False),
+    "get_user_groups": (lambda sample: {"uid": sample["sample_uid"]}, False),
+    "compare_group_memberships": (lambda sample: {"group_names": sample["sample_groups"]}, False),
+    "get_detailed_person_profile": (lambda sample: {"uid": sample["sample_uid"]}, False),
+    "correlate_rover_groups_with_jira": (lambda sample: {"group_name": sample["sample_group"]}, False),
+    "find_company_group_usage_patterns": (lambda sample: {"group_pattern": "sp-", "max_groups": 0}, True),
+    "find_unused_accounts_and_teams": (lambda sample: {"max_groups": 0}, True),
+}
+
+# Latency and RSS changes smaller than these are treated as noise
+LATENCY_NOISE_MS = 5.0
+RSS_NOISE_MIB = 5.0
+
+
+def percentile(values: list[float], pct: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def peak_rss_mib() -> float:
+    """
+    Peak resident set size of this process in MiB.
+
+    VmHWM is reset by exec, unlike ru_maxrss which Linux carries over from
+    the parent; ru_maxrss (KiB on Linux, bytes on macOS) is the fallback.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def reset_process_state(mcp_server) -> None:
+    """Forget what earlier calls left in memory: cached responses and the membership index."""
+    mcp_server.clear_response_cache()
+    mcp_server.MEMBERSHIP_INDEX.clear()
+
+
+async def run_worker(tool: str, mock_url: str, iterations: int, cache: str) -> dict:
+    """Call one tool repeatedly in this process and measure it."""
+    import mcp_server
+
+    import_rss = peak_rss_mib()
+    async with httpx.AsyncClient(base_url=mock_url) as control:
+        sample = (await control.get("/_org")).json()
+        kwargs = SCENARIOS[tool][0](sample)
+        fn = getattr(mcp_server, tool)
+
+        # One untimed call creates the HTTP client and loads the focus rules
+        await fn(**kwargs)
+        await control.post("/_stats/reset")
+
+        latencies = []
+        errors = 0
+        for _ in range(iterations):
+            if cache == "cold":
+                reset_process_state(mcp_server)
+            start = time.perf_counter()
+            result = await fn(**kwargs)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if isinstance(result, dict) and "error" in result:
+                errors += 1
+
+        upstream = (await control.get("/_stats")).json()
+    await mcp_server.close_http_client()
+
+    upstream_errors = sum(count for status, count in upstream["by_status"].items() if int(status) >= 500)
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "max_ms": round(max(latencies), 2),
+        "errors": errors,
+        "upstream_requests": round(upstream["total"] / iterations, 2),
+        "upstream_by_route": {
+            route: round(count / iterations, 2) for route, count in sorted(upstream["by_route"].items())
+        },
+        "upstream_errors": upstream_errors,
+        "upstream_bytes": upstream["bytes_sent"] // iterations,
+        "import_rss_mib": import_rss,
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Mock groups API exited with status {process.returncode}")
+        try:
+            httpx.get(f"{url}/_org", timeout=1).raise_for_status()
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Mock groups API did not start within {timeout:.0f}s")
+
+
+def benchmark_scale(scale: str, tools: list[str], args, env: dict) -> dict:
+    """Start the mock for one scale and run every tool's worker against it."""
+    size = SCALES[scale]
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="rover-bench-") as workdir:
+        org_file = os.path.join(workdir, "org.db")
+        fixture = os.path.join(workdir, "jira_fixture.db")
+        generated = subprocess.run(
+            [
+                sys.executable, os.path.join(SCRIPTS_DIR, "synthetic_org.py"),
+                "--groups", str(size["groups"]),
+                "--users", str(size["users"]),
+                "--seed", str(args.seed),
+                "--output", org_file,
+                "--jira-fixture", fixture,
+            ],
+            env=env, capture_output=True, text=True, check=True,
+        )
+        print(f"\n[{scale}]")
+        print("\n".join(f"  {line}" for line in generated.stdout.strip().splitlines()))
+
+        port = free_port()
+        mock_url = f"http://127.0.0.1:{port}"
+        mock = subprocess.Popen(
+            [
+                sys.executable, os.path.join(SCRIPTS_DIR, "mock_groups_api.py"),
+                "--org", org_file,
+                "--seed", str(args.seed),
+                "--port", str(port),
+                "--latency-ms", str(args.latency_ms),
+                "--jitter-ms", str(args.jitter_ms),
+                "--error-rate", str(args.error_rate),
+            ],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_ready(mock_url, mock)
+            worker_env = {
+                **env,
+                "API_BASE_URL": f"{mock_url}/v1",
+                "JIRA_FIXTURE_PATH": fixture,
+            }
+            for tool in tools:
+                iterations = args.heavy_iterations if SCENARIOS[tool][1] else args.iterations
+                completed = subprocess.run(
+                    [
+                        sys.executable, os.path.abspath(__file__), "--worker", tool,
+                        "--mock-url", mock_url,
+                        "--iterations", str(iterations),
+                        "--cache", args.cache,
+                    ],
+                    env={**worker_env, **SCENARIO_ENV.get(tool, lambda workdir: {})(workdir)},
+                    capture_output=True,
+                    text=True,
+                )
+                if completed.returncode != 0:
+                    print(f"  {tool}: worker failed\n{completed.stderr.strip()}", file=sys.stderr)
+                    continue
+                results[tool] = json.loads(completed.stdout.strip().splitlines()[-1])
+                print_result(tool, results[tool])
+        finally:
+            mock.terminate()
+            mock.wait()
+    return results
+
+
+def print_result(tool: str, result: dict) -> None:
+    errors = f"  errors={result['errors']}" if result["errors"] else ""
+    print(
+        f"  {tool:<36} p50={result['p50_ms']:>9.1f}ms  p95={result['p95_ms']:>9.1f}ms  "
+        f"p99={result['p99_ms']:>9.1f}ms  upstream={result['upstream_requests']:>8.1f}  "
+        f"rss={result['peak_rss_mib']:>6.1f}MiB{errors}"
+    )
+
+
+def compare_with_baseline(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """List metrics that regressed beyond the threshold relative to the baseline."""
+    regressions = []
+    for scale, tools in report["scales"].items():
+        for tool, current in tools.items():
+            previous = baseline.get("scales", {}).get(scale, {}).get(tool)
+            if previous is None:
+                continue
+            for metric, noise in (("p95_ms", LATENCY_NOISE_MS), ("p99_ms", LATENCY_NOISE_MS),
+                                  ("peak_rss_mib", RSS_NOISE_MIB), ("upstream_requests", 0.5)):
+                before, after = previous.get(metric), current.get(metric)
+                if before is None or after is None:
+                    continue
+                if after > before * (1 + threshold) and after - before > noise:
+                    regressions.append(f"{scale}/{tool} {metric}: {before} -> {after}")
+            if current["errors"] > previous.get("errors", 0):
+                regressions.append(f"{scale}/{tool} errors: {previous.get('errors', 0)} -> {current['errors']}")
+    return regressions
+
+
+def git_revision() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MCP tools against a local groups API mock")
+    parser.add_argument("--scales", default="small,medium", help=f"Comma-separated scales from {', '.join(SCALES)}")
+    parser.add_argument("--tools", default="", help="Comma-separated tools to run (default: all)")
+    parser.add_argument("--iterations", type=int, default=20, help="Calls per tool")
+    parser.add_argument("--heavy-iterations", type=int, default=3, help="Calls per tool that walks many groups")
+    parser.add_argument("--cache", choices=("cold", "warm"), default="cold",
+                        help="Clear the response cache and membership index before every call, or keep them warm")
+    parser.add_argument("--latency-ms", type=float, default=10, help="Mock latency per upstream request")
+    parser.add_argument("--jitter-ms", type=float, default=2, help="Uniform jitter around the mock latency")
+    parser.add_argument("--error-rate", type=float, default=0, help="Share of upstream requests failing with 503")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra server environment, e.g. --env RATE_LIMIT_RPS=50")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--no-compare", action="store_true", help="Skip the baseline comparison")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the report as the new baseline")
+    parser.add_argument("--worker", metavar="TOOL", help=argparse.SUPPRESS)
+    parser.add_argument("--mock-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # The request log of the readiness and stats probes would drown the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.worker:
+        print(json.dumps(asyncio.run(run_worker(args.worker, args.mock_url, args.iterations, args.cache))))
+        return 0
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"unknown scales: {', '.join(unknown)}")
+    tools = [tool.strip() for tool in args.tools.split(",") if tool.strip()] or list(SCENARIOS)
+    unknown = [tool for tool in tools if tool not in SCENARIOS]
+    if unknown:
+        parser.error(f"no scenario for: {', '.join(unknown)}")
+
+    # Every registered tool should have a scenario
+    from mcp_server import mcp
+
+    uncovered = sorted({tool.name for tool in asyncio.run(mcp.list_tools())} - set(SCENARIOS))
+    if uncovered:
+        print(f"Warning: no benchmark scenario for {', '.join(uncovered)}", file=sys.stderr)
+
+    server_env = dict(BENCHMARK_ENV)
+    for item in args.env:
+        key, _, value = item.partition("=")
+        server_env[key] = value
+    pythonpath = os.pathsep.join(filter(None, [REPO_ROOT, SCRIPTS_DIR, os.environ.get("PYTHONPATH")]))
+    env = {**os.environ, **server_env, "PYTHONPATH": pythonpath}
+
+    report = {
+        "version": 1,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "iterations": args.iterations,
+            "heavy_iterations": args.heavy_iterations,
+            "cache": args.cache,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+            "scales": {scale: SCALES[scale] for scale in scales},
+            "server_env": server_env,
+        },
+        "scales": {},
+    }
+    for scale in scales:
+        report["scales"][scale] = benchmark_scale(scale, tools, args, env)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nWrote {args.output}")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nUpdated baseline {args.baseline}")
+        return 0
+
+    if args.no_compare or not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    changed = [
+        key for key in ("cache", "latency_ms", "jitter_ms", "error_rate", "seed", "server_env")
+        if baseline.get("settings", {}).get(key) != report["settings"][key]
+    ]
+    if changed:
+        print(f"\nWarning: settings differ from the baseline ({', '.join(changed)}); comparison may be misleading")
+    regressions = compare_with_baseline(report, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regressions against {args.baseline}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
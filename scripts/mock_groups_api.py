@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Red Hat internal groups API.
+
+Serves an org file from scripts/synthetic_org.py (or a small generated one)
+under /v1 with configurable latency and error rate, so the MCP tools can be
+benchmarked and developed offline. Point the server at it with API_BASE_URL=http://127.0.0.1:8800/v1;
+plain-HTTP base URLs need no client certificate.
+
+Besides the groups API the mock serves:
+    GET  /_org          org size and sample group/user names for test drivers
+    GET  /_stats        requests served, by route and status
+    POST /_stats/reset  clear the request counters
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from synthetic_org import SyntheticOrg, write_org
+
+
+class OrgStore:
+    """Read-only view of an org file written by scripts/synthetic_org.py."""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._sample = None
+
+    def count(self, table: str) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def etag(self, cn: str) -> str | None:
+        row = self.conn.execute("SELECT etag FROM groups WHERE cn = ?", (cn,)).fetchone()
+        return row["etag"] if row else None
+
+    def group(self, cn: str) -> dict | None:
+        row = self.conn.execute("SELECT cn, description FROM groups WHERE cn = ?", (cn,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "cn": row["cn"],
+            "name": row["cn"],
+            "description": row["description"],
+            "owners": [{"id": uid, "type": "user"} for uid in self.owners(cn)],
+            "members": [
+                {"id": member["id"], "type": member["type"]}
+                for member in self.conn.execute("SELECT id, type FROM group_members WHERE cn = ?", (cn,))
+            ],
+        }
+
+    def owners(self, cn: str) -> list[str]:
+        return [row["uid"] for row in self.conn.execute("SELECT uid FROM group_owners WHERE cn = ?", (cn,))]
+
+    def exclusions(self, cn: str) -> list[str]:
+        return [row["uid"] for row in self.conn.execute("SELECT uid FROM group_exclusions WHERE cn = ?", (cn,))]
+
+    def groups_page(self, criteria: str, page: int, count: int) -> list[dict]:
+        pattern = "%" + criteria.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = self.conn.execute(
+            "SELECT cn, description FROM groups WHERE cn LIKE ? ESCAPE '\\' ORDER BY idx LIMIT ? OFFSET ?",
+            (pattern, count, page * count),
+        )
+        return [{"cn": row["cn"], "name": row["cn"], "description": row["description"]} for row in rows]
+
+    def user(self, uid: str) -> dict | None:
+        row = self.conn.execute("SELECT uid, cn, mail, title FROM users WHERE uid = ?", (uid,)).fetchone()
+        return dict(row) if row else None
+
+    def user_groups(self, uid: str) -> list[dict]:
+        rows = self.conn.execute(
+            "SELECT cn, description FROM groups WHERE cn IN "
+            "(SELECT cn FROM group_members WHERE id = ? UNION SELECT cn FROM group_owners WHERE uid = ?) "
+            "ORDER BY idx",
+            (uid, uid),
+        )
+        return [{"cn": row["cn"], "name": row["cn"], "description": row["description"]} for row in rows]
+
+    def sample(self, count: int = 5) -> dict:
+        """Pick stable group and user names for drivers: the busiest user and their groups."""
+        if self._sample is None:
+            uid = self.conn.execute(
+                "SELECT id FROM group_members WHERE type = 'user' "
+                "GROUP BY id ORDER BY COUNT(*) DESC, id LIMIT 1"
+            ).fetchone()[0]
+            group = self.conn.execute(
+                "SELECT cn FROM groups WHERE cn LIKE 'sp-%' AND parent IS NULL ORDER BY idx LIMIT 1"
+            ).fetchone() or self.conn.execute("SELECT cn FROM groups ORDER BY idx LIMIT 1").fetchone()
+            meta = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+            self._sample = {
+                "groups": self.count("groups"),
+                "users": self.count("users"),
+                "seed": int(meta.get("seed", 0)),
+                "sample_group": group[0],
+                "sample_groups": [group["cn"] for group in self.user_groups(uid)[:count]],
+                "sample_uid": uid,
+            }
+        return self._sample
+
+
+class MockGroupsAPI:
+    """Starlette app serving an org file with injected latency and errors."""
+
+    def __init__(
+        self,
+        org: OrgStore,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0,
+        error_status: int = 503,
+        user_groups_status: int = 200,
+        seed: int = 1,
+    ):
+        self.org = org
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.user_groups_status = user_groups_status
+        self.rng = random.Random(seed)
+        self.requests = Counter()
+        self.bytes_sent = 0
+        self.started = time.time()
+
+    def served(self, route: str, handler):
+        """Wrap a handler with latency, error injection and request counting."""
+        async def endpoint(request: Request) -> Response:
+            delay = self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000)
+            if self.error_rate and self.rng.random() < self.error_rate:
+                response = Response("injected failure", status_code=self.error_status)
+            else:
+                response = handler(request)
+            self.requests[(route, response.status_code)] += 1
+            self.bytes_sent += len(response.body)
+            return response
+        return endpoint
+
+    def list_groups(self, request: Request) -> Response:
+        criteria = request.query_params.get("criteria", "")
+        page = int(request.query_params.get("page", 0) or 0)
+        count = int(request.query_params.get("count", 0) or 100)
+        return JSONResponse({"groups": self.org.groups_page(criteria, page, count)})
+
+    def get_group(self, request: Request) -> Response:
+        cn = request.path_params["cn"]
+        etag = self.org.etag(cn)
+        if etag is None:
+            return Response("group not found", status_code=404)
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse(self.org.group(cn), headers={"ETag": etag})
+
+    def get_owners(self, request: Request) -> Response:
+        cn = request.path_params["cn"]
+        if self.org.etag(cn) is None:
+            return Response("group not found", status_code=404)
+        return JSONResponse({"owners": [{"uid": uid} for uid in self.org.owners(cn)]})
+
+    def get_exclusions(self, request: Request) -> Response:
+        cn = request.path_params["cn"]
+        if self.org.etag(cn) is None:
+            return Response("group not found", status_code=404)
+        return JSONResponse({"exclusions": [{"uid": uid} for uid in self.org.exclusions(cn)]})
+
+    def validate_name(self, request: Request) -> Response:
+        cn = request.query_params.get("cn", "")
+        valid = bool(cn) and cn.replace("-", "").isalnum() and self.org.etag(cn) is None
+        return JSONResponse({"cn": cn, "valid": valid})
+
+    def get_user(self, request: Request) -> Response:
+        user = self.org.user(request.path_params["uid"])
+        if user is None:
+            return Response("user not found", status_code=404)
+        return JSONResponse(user)
+
+    def get_user_groups(self, request: Request) -> Response:
+        if self.user_groups_status != 200:
+            return Response("unauthorized", status_code=self.user_groups_status)
+        uid = request.path_params["uid"]
+        if self.org.user(uid) is None:
+            return Response("user not found", status_code=404)
+        return JSONResponse({"groups": self.org.user_groups(uid)})
+
+    async def org_info(self, request: Request) -> Response:
+        return JSONResponse(self.org.sample())
+
+    async def stats(self, request: Request) -> Response:
+        by_route = Counter()
+        by_status = Counter()
+        for (route, status), count in self.requests.items():
+            by_route[route] += count
+            by_status[str(status)] += count
+        return JSONResponse({
+            "total": sum(self.requests.values()),
+            "by_route": dict(by_route),
+            "by_status": dict(by_status),
+            "bytes_sent": self.bytes_sent,
+            "uptime_seconds": round(time.time() - self.started, 1),
+        })
+
+    async def reset_stats(self, request: Request) -> Response:
+        self.requests.clear()
+        self.bytes_sent = 0
+        return JSONResponse({"reset": True})
+
+    def app(self) -> Starlette:
+        api = [
+            ("/v1/groups", self.list_groups),
+            # Registered before /groups/{cn} so "validate" is not read as a group name
+            ("/v1/groups/validate/name", self.validate_name),
+            ("/v1/groups/{cn}", self.get_group),
+            ("/v1/groups/{cn}/owners", self.get_owners),
+            ("/v1/groups/{cn}/exclusions", self.get_exclusions),
+            ("/v1/users/{uid}", self.get_user),
+            ("/v1/users/{uid}/groups", self.get_user_groups),
+        ]
+        routes = [Route(path, self.served(path[3:], handler)) for path, handler in api]
+        routes += [
+            Route("/_org", self.org_info),
+            Route("/_stats", self.stats),
+            Route("/_stats/reset", self.reset_stats, methods=["POST"]),
+        ]
+        return Starlette(routes=routes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic org as a local groups API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--org", help="Org file from scripts/synthetic_org.py (default: generate one)")
+    parser.add_argument("--groups", type=int, default=200, help="Number of groups to generate without --org")
+    parser.add_argument("--users", type=int, default=1000, help="Number of users to generate without --org")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Uniform jitter around the latency")
+    parser.add_argument("--error-rate", type=float, default=0, help="Share of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--user-groups-status", type=int, default=200,
+                        help="Status for /users/{uid}/groups; 401 mimics the production service account")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mock-groups-") as workdir:
+        path = args.org
+        if path is None:
+            path = os.path.join(workdir, "org.db")
+            write_org(path, SyntheticOrg(groups=args.groups, users=args.users, seed=args.seed))
+        org = OrgStore(path)
+
+        api = MockGroupsAPI(
+            org,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            user_groups_status=args.user_groups_status,
+            seed=args.seed,
+        )
+        print(f"Serving {org.count('groups')} groups and {org.count('users')} users on http://{args.host}:{args.port}/v1")
+        uvicorn.run(api.app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
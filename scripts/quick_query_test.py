@@ -15,6 +15,7 @@ os.environ["KEY_FILE"] = "privkey.pem"
 
 from mcp_server import (
     rover_group,
+    compare_group_memberships,
     get_comprehensive_member_profile,
     correlate_rover_groups_with_jira
 )
@@ -33,9 +34,13 @@ async def demo_query_1():
                       "Who are the members of the sp-ai-support-chatbot team and what are their roles?")
     
     try:
-        # Get team structure
+        # Get team structure; both groups land in the membership index
         team_data = await rover_group("sp-ai-support-chatbot")
-        admin_data = await rover_group("sp-ai-support-chatbot-admins")
+        comparison = await compare_group_memberships(
+            ["sp-ai-support-chatbot", "sp-ai-support-chatbot-admins"], role="member"
+        )
+        members = []
+        admin_count = 0
         
         if "error" not in team_data:
             print(f"\n🏢 **Team: sp-ai-support-chatbot**")
@@ -47,26 +52,24 @@ async def demo_query_1():
             if members:
                 print(f"\n📋 Team Members:")
                 for i, member in enumerate(members[:8], 1):  # Show first 8
-                    uid = member.get("uid", "Unknown")
+                    uid = member.get("id") or member.get("uid", "Unknown")
                     print(f"   {i:2d}. {uid}")
                 if len(members) > 8:
                     print(f"   ... and {len(members) - 8} more members")
         
-        if "error" not in admin_data:
-            admin_members = admin_data.get("members", [])
+        if "error" not in comparison and "sp-ai-support-chatbot-admins" in comparison["groups"]:
+            admin_count = comparison["groups"]["sp-ai-support-chatbot-admins"]
             print(f"\n👑 **Admin Team: sp-ai-support-chatbot-admins**")
-            print(f"🔐 Admin Members: {len(admin_members)}")
+            print(f"🔐 Admin Members: {admin_count}")
             
-            # Find overlap
-            team_uids = {m.get("uid") for m in members}
-            admin_uids = {m.get("uid") for m in admin_members}
-            overlap = team_uids.intersection(admin_uids)
+            # Overlap comes straight from the membership index
+            overlap = comparison["common_members"]
             
             print(f"🔗 Members with admin privileges: {len(overlap)}")
             if overlap:
-                print(f"   Admin members: {', '.join(list(overlap)[:5])}")
+                print(f"   Admin members: {', '.join(overlap[:5])}")
         
-        print(f"\n✅ **Answer**: The team has {len(members)} total members with {len(admin_members)} having admin privileges.")
+        print(f"\n✅ **Answer**: The team has {len(members)} total members with {admin_count} having admin privileges.")
         
     except Exception as e:
         print(f"❌ Error: {str(e)}")
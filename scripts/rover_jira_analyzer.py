@@ -9,20 +9,17 @@ import json
 import sys
 from collections import defaultdict
 from typing import Dict, List, Set
-from mcp_server import rover_group
-
-# We need to simulate the JIRA MCP calls since we can't import them directly
-# In a real MCP client, these would be actual tool calls
+from mcp_server import rover_group, get_jira_backend
 
 async def search_jira_for_member(member_id: str, limit: int = 50) -> Dict:
     """Search JIRA for issues involving a specific member."""
     print(f"    🔍 Searching JIRA for: {member_id}")
     
-    # This simulates: await mcp_jira_snowflake_list_jira_issues(search_text=member_id, limit=limit)
-    # For now, return mock data - you would replace this with actual MCP tool calls
+    # Uses the backend selected by JIRA_BACKEND (snowflake, http, fixture or none)
+    issues = await get_jira_backend().search(member_id, limit)
     return {
-        "issues": [],
-        "total_returned": 0,
+        "issues": issues,
+        "total_returned": len(issues),
         "filters_applied": {"search_text": member_id, "limit": limit}
     }
 
@@ -9,14 +9,18 @@ import json
 import sys
 from collections import defaultdict
 from typing import Dict, List, Set
-from mcp_server import rover_group
+from mcp_server import rover_group, get_jira_backend
 
-# Mock the JIRA MCP functions for now - in real usage these would be MCP calls
 async def list_jira_issues(search_text: str = None, limit: int = 50) -> Dict:
-    """Mock function - replace with actual MCP call to jira-mcp-snowflake"""
-    # This would be: await mcp_jira_snowflake_list_jira_issues(search_text=search_text, limit=limit)
+    """Search the configured JIRA backend; "field:uid" limits matches to that role."""
     print(f"🔍 Searching JIRA for: {search_text}")
-    return {"issues": [], "total": 0}
+    if not search_text:
+        return {"issues": [], "total": 0}
+    field, _, member_id = search_text.rpartition(":")
+    issues = await get_jira_backend().search(member_id, limit)
+    if field:
+        issues = [issue for issue in issues if issue.get(field) == member_id]
+    return {"issues": issues, "total": len(issues)}
 
 async def get_jira_project_summary() -> Dict:
     """Mock function - replace with actual MCP call"""
@@ -90,10 +94,8 @@ class RoverJiraIntegrator:
         }
         
         # Search for issues involving this member
-        # In real implementation, you would use the actual MCP calls here
         print(f"  📋 Searching JIRA issues for {member_id}...")
         
-        # Mock searches - replace with actual JIRA MCP calls
         search_patterns = [
             f"assignee:{member_id}",
             f"reporter:{member_id}",
@@ -103,7 +105,6 @@ class RoverJiraIntegrator:
         
         for pattern in search_patterns:
             try:
-                # Replace with: await mcp_jira_snowflake_list_jira_issues(search_text=pattern, limit=100)
                 issues_data = await list_jira_issues(search_text=pattern, limit=100)
                 
                 for issue in issues_data.get('issues', []):
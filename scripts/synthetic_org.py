@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic org generator for scale testing.
+
+Generates users, groups and JIRA issue histories from a seed and streams them
+into SQLite, so orgs of 100k users and 30k groups are written without holding
+the org in memory. scripts/mock_groups_api.py serves the org file and the
+issue file is read by the `fixture` JIRA backend.
+
+The org is shaped like a real one:
+- users sit in neighbourhoods of NEIGHBOURHOOD_SIZE consecutive uids that
+  share a topic and a manager;
+- group sizes are heavy-tailed, members are drawn around a neighbourhood so
+  groups overlap, and the neighbourhood manager co-owns its groups;
+- some sp- groups have a nested "-admins" group drawn from their members;
+- some groups carry exclusions;
+- JIRA histories follow the user's topic and activity level, so dormant
+  owners make dormant groups.
+
+Usage:
+    python scripts/synthetic_org.py --groups 30000 --users 100000 \\
+        --output org.db --jira-fixture jira_fixture.db
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_server import FOCUS_RULES_FILE, write_jira_fixture
+
+NEIGHBOURHOOD_SIZE = 50
+GROUP_TOPICS = (
+    "pulp", "cloud", "ci", "monitoring", "access", "release", "docs", "infra",
+    "security", "support", "konflux", "triage", "storage", "network",
+)
+# Share of groups per name prefix; admin groups are added as children of sp- groups
+GROUP_PREFIXES = (("sp-", 0.45), ("team-", 0.25), ("eng-", 0.2), ("all-", 0.1))
+ADMIN_CHILD_SHARE = 0.3
+EXCLUSION_SHARE = 0.08
+# Share of users per activity level, which drives their JIRA history
+ACTIVITY_LEVELS = (("active", 0.55), ("occasional", 0.25), ("dormant", 0.2))
+USER_TITLES = ("Software Engineer", "Senior Software Engineer", "Principal Engineer", "Engineering Manager")
+JIRA_STATUSES = ("Closed", "Closed", "Closed", "In Progress", "New", "Review")
+JIRA_PRIORITIES = ("Minor", "Major", "Major", "Critical", "Blocker")
+JIRA_ISSUE_TYPES = ("Task", "Story", "Bug", "Epic")
+JIRA_SUMMARIES = (
+    "Fix pulp push failure for {topic}",
+    "Update access role mapping for {topic}",
+    "Migrate {topic} workers to cloud aws accounts",
+    "Stabilize jenkins ci job for {topic}",
+    "Add prometheus monitoring alerts for {topic}",
+    "Document {topic} runbook",
+)
+
+ORG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    uid TEXT PRIMARY KEY, cn TEXT, mail TEXT, title TEXT, topic TEXT, activity TEXT
+);
+CREATE TABLE IF NOT EXISTS groups (
+    idx INTEGER PRIMARY KEY, cn TEXT UNIQUE, description TEXT, parent TEXT, etag TEXT
+);
+CREATE TABLE IF NOT EXISTS group_members (cn TEXT, id TEXT, type TEXT);
+CREATE TABLE IF NOT EXISTS group_owners (cn TEXT, uid TEXT);
+CREATE TABLE IF NOT EXISTS group_exclusions (cn TEXT, uid TEXT);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+# Built after the bulk insert, which is much faster than maintaining them row by row
+ORG_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_group_members_cn ON group_members (cn);
+CREATE INDEX IF NOT EXISTS idx_group_members_id ON group_members (id);
+CREATE INDEX IF NOT EXISTS idx_group_owners_cn ON group_owners (cn);
+CREATE INDEX IF NOT EXISTS idx_group_owners_uid ON group_owners (uid);
+CREATE INDEX IF NOT EXISTS idx_group_exclusions_cn ON group_exclusions (cn);
+"""
+
+
+def load_jira_projects(path: str = FOCUS_RULES_FILE) -> list[str]:
+    """Return the JIRA project keys from a focus rules file, so fixture issues map to expertise."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            projects = list(json.load(f).get("project_expertise", {}))
+    except (OSError, ValueError):
+        projects = []
+    return projects or ["PROJ"]
+
+
+def _weighted(rng: random.Random, choices) -> str:
+    roll = rng.random()
+    for value, share in choices:
+        roll -= share
+        if roll < 0:
+            return value
+    return choices[-1][0]
+
+
+@lru_cache(maxsize=4096)
+def _topic(seed: int, neighbourhood: int) -> str:
+    return random.Random(f"{seed}:topic:{neighbourhood}").choice(GROUP_TOPICS)
+
+
+class SyntheticOrg:
+    """
+    Deterministic org description; every user attribute is derived from the
+    seed and uid index alone, and groups are generated in one sequential
+    pass, so nothing has to be kept in memory between records.
+    """
+
+    def __init__(self, groups: int, users: int, seed: int = 1):
+        self.groups = groups
+        self.users = max(users, NEIGHBOURHOOD_SIZE)
+        self.seed = seed
+
+    def uid(self, index: int) -> str:
+        return f"user{index:06d}"
+
+    def topic(self, neighbourhood: int) -> str:
+        return _topic(self.seed, neighbourhood)
+
+    def manager(self, index: int) -> int:
+        """The first user of each neighbourhood manages it."""
+        return index - index % NEIGHBOURHOOD_SIZE
+
+    def user(self, index: int) -> dict:
+        rng = random.Random(f"{self.seed}:user:{index}")
+        is_manager = self.manager(index) == index
+        activity = "active" if is_manager and rng.random() < 0.9 else _weighted(rng, ACTIVITY_LEVELS)
+        uid = self.uid(index)
+        return {
+            "uid": uid,
+            "cn": f"User {index}",
+            "mail": f"{uid}@example.com",
+            "title": USER_TITLES[-1] if is_manager else rng.choice(USER_TITLES[:-1]),
+            "topic": self.topic(index // NEIGHBOURHOOD_SIZE),
+            "activity": activity,
+        }
+
+    def iter_users(self):
+        for index in range(self.users):
+            yield self.user(index)
+
+    def _members_around(self, rng: random.Random, center: int, size: int) -> list[int]:
+        """Pick members from a window around a neighbourhood, wrapping at the end of the uid range."""
+        window = min(self.users, max(size * 3, NEIGHBOURHOOD_SIZE))
+        start = center - window // 2
+        return sorted((start + offset) % self.users for offset in rng.sample(range(window), size))
+
+    def iter_groups(self):
+        """
+        Yield groups as {"cn", "description", "parent", "members", "owners",
+        "exclusions"}; members are (id, type) pairs where type is "user" or
+        "group" for a nested group.
+        """
+        rng = random.Random(f"{self.seed}:groups")
+        index = 0
+        while index < self.groups:
+            prefix = _weighted(rng, GROUP_PREFIXES)
+            center = rng.randrange(self.users)
+            topic = self.topic(center // NEIGHBOURHOOD_SIZE)
+            cn = f"{prefix}{topic}-{index:05d}"
+            size = min(self.users, max(1, int(rng.paretovariate(1.1) * 3)))
+            members = self._members_around(rng, center, size)
+
+            manager = self.manager(center)
+            owners = {manager} if rng.random() < 0.8 else set()
+            owners.update(rng.sample(members, min(len(members), rng.randint(0, 2))))
+            if not owners:
+                owners.add(members[0])
+            exclusions = []
+            if rng.random() < EXCLUSION_SHARE:
+                exclusions = sorted(rng.sample(members, min(len(members), rng.randint(1, 5))))
+
+            child = None
+            if prefix == "sp-" and index + 1 < self.groups and rng.random() < ADMIN_CHILD_SHARE:
+                child = {
+                    "cn": f"{cn}-admins",
+                    "description": f"Administrators of {cn}",
+                    "parent": cn,
+                    "members": [(self.uid(uid), "user") for uid in rng.sample(members, max(1, len(members) // 10))],
+                    "owners": sorted(self.uid(uid) for uid in owners),
+                    "exclusions": [],
+                }
+
+            yield {
+                "cn": cn,
+                "description": f"Synthetic {topic} group",
+                "parent": None,
+                "members": [(self.uid(uid), "user") for uid in members]
+                + ([(child["cn"], "group")] if child else []),
+                "owners": sorted(self.uid(uid) for uid in owners),
+                "exclusions": [self.uid(uid) for uid in exclusions],
+            }
+            index += 1
+            if child:
+                yield child
+                index += 1
+
+    def iter_jira_issues(self, projects: list[str]):
+        """Yield each user's JIRA history, following their topic and activity level."""
+        now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        topic_projects = {topic: projects[position % len(projects)] for position, topic in enumerate(GROUP_TOPICS)}
+        for index in range(self.users):
+            user = self.user(index)
+            rng = random.Random(f"{self.seed}:jira:{index}")
+            if user["activity"] == "active":
+                count, oldest, newest = min(60, int(rng.paretovariate(1.2) * 4)), 180, 0
+            elif user["activity"] == "occasional":
+                count, oldest, newest = rng.randint(1, 3), 900, 200
+            else:
+                continue
+            home = topic_projects[user["topic"]]
+            reporter = self.uid(self.manager(index))
+            for number in range(count):
+                project = home if rng.random() < 0.75 else rng.choice(projects)
+                updated = now - timedelta(days=rng.randint(newest, oldest))
+                yield {
+                    "key": f"{project}-{index}{number:03d}",
+                    "project": project,
+                    "summary": rng.choice(JIRA_SUMMARIES).format(topic=user["topic"]),
+                    "status": rng.choice(JIRA_STATUSES),
+                    "priority": rng.choice(JIRA_PRIORITIES),
+                    "issue_type": rng.choice(JIRA_ISSUE_TYPES),
+                    "assignee": user["uid"],
+                    "reporter": user["uid"] if rng.random() < 0.6 else reporter,
+                    "creator": user["uid"],
+                    "created": (updated - timedelta(days=rng.randint(0, 60))).isoformat(),
+                    "updated": updated.isoformat(),
+                }
+
+
+def _etag(seed: int, cn: str) -> str:
+    return '"' + hashlib.sha1(f"{seed}:{cn}".encode()).hexdigest()[:16] + '"'
+
+
+def write_org(path: str, org: SyntheticOrg, chunk_size: int = 5000) -> dict:
+    """Stream the org into a SQLite file in chunks, returning row counts."""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    counts = {"users": 0, "groups": 0, "members": 0, "owners": 0, "exclusions": 0}
+    try:
+        conn.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;" + ORG_SCHEMA)
+
+        chunk = []
+        for user in org.iter_users():
+            chunk.append(tuple(user[key] for key in ("uid", "cn", "mail", "title", "topic", "activity")))
+            if len(chunk) >= chunk_size:
+                conn.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?, ?)", chunk)
+                counts["users"] += len(chunk)
+                chunk = []
+        conn.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?, ?)", chunk)
+        counts["users"] += len(chunk)
+
+        rows = {"groups": [], "members": [], "owners": [], "exclusions": []}
+        statements = {
+            "groups": "INSERT INTO groups VALUES (?, ?, ?, ?, ?)",
+            "members": "INSERT INTO group_members VALUES (?, ?, ?)",
+            "owners": "INSERT INTO group_owners VALUES (?, ?)",
+            "exclusions": "INSERT INTO group_exclusions VALUES (?, ?)",
+        }
+
+        def flush():
+            for table, pending in rows.items():
+                conn.executemany(statements[table], pending)
+                counts[table] += len(pending)
+                pending.clear()
+
+        for index, group in enumerate(org.iter_groups()):
+            cn = group["cn"]
+            rows["groups"].append((index, cn, group["description"], group["parent"], _etag(org.seed, cn)))
+            rows["members"].extend((cn, member, kind) for member, kind in group["members"])
+            rows["owners"].extend((cn, uid) for uid in group["owners"])
+            rows["exclusions"].extend((cn, uid) for uid in group["exclusions"])
+            if len(rows["members"]) >= chunk_size:
+                flush()
+        flush()
+
+        conn.executescript(ORG_INDEXES)
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [("seed", str(org.seed)), ("groups", str(org.groups)), ("users", str(org.users))],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic org")
+    parser.add_argument("--groups", type=int, default=30000, help="Number of groups")
+    parser.add_argument("--users", type=int, default=100000, help="Number of users")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="SQLite org file served by scripts/mock_groups_api.py --org")
+    parser.add_argument("--jira-fixture", help="SQLite JIRA fixture for JIRA_BACKEND=fixture")
+    args = parser.parse_args()
+    if not args.output and not args.jira_fixture:
+        parser.error("nothing to write: pass --output and/or --jira-fixture")
+
+    org = SyntheticOrg(groups=args.groups, users=args.users, seed=args.seed)
+    if args.output:
+        start = time.perf_counter()
+        counts = write_org(args.output, org)
+        summary = ", ".join(f"{count} {table}" for table, count in counts.items())
+        print(f"Wrote {summary} to {args.output} in {time.perf_counter() - start:.1f}s")
+    if args.jira_fixture:
+        start = time.perf_counter()
+        if os.path.exists(args.jira_fixture):
+            os.remove(args.jira_fixture)
+        written = write_jira_fixture(args.jira_fixture, org.iter_jira_issues(load_jira_projects()))
+        print(f"Wrote {written} issues to {args.jira_fixture} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
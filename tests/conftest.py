@@ -0,0 +1,131 @@
+"""Shared fixtures: a scripted groups API behind httpx.MockTransport."""
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+# Settings are read when mcp_server is imported. A plain-HTTP base URL needs
+# no client certificate, and the client-side rate limit would only slow the
+# tests down.
+os.environ.update({
+    "API_BASE_URL": "http://groups.test/v1",
+    "RATE_LIMIT_RPS": "0",
+    "RETRY_BACKOFF_BASE": "0.01",
+    "SNAPSHOT_DB": "",
+    "JIRA_BACKEND": "none",
+    "TRACE_BUFFER_SIZE": "0",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mcp_server  # noqa: E402
+
+
+class FakeGroupsAPI:
+    """
+    Scripted stand-in for the groups API.
+
+    Serves group documents with ETags, group owners and the paged /groups
+    listing. Responses queued with `fail` are returned first for their path,
+    and `delay` is added to every request unless `delays` has one for its path.
+    """
+
+    def __init__(self):
+        self.groups: dict[str, dict] = {}
+        self.requests: list[httpx.Request] = []
+        self.queued: dict[str, list[httpx.Response]] = {}
+        self.delay = 0.0
+        self.delays: dict[str, float] = {}
+
+    def add_group(self, cn: str, owners=(), members=(), etag: str = "v1") -> None:
+        self.groups[cn] = {"owners": list(owners), "members": list(members), "etag": etag}
+
+    def fail(self, path: str, *responses: httpx.Response) -> None:
+        self.queued.setdefault(path, []).extend(responses)
+
+    def count(self, path: str) -> int:
+        return sum(1 for request in self.requests if request.url.path == f"/v1{path}")
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        path = request.url.path.removeprefix("/v1")
+        delay = self.delays.get(path, self.delay)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.queued.get(path):
+            return self.queued[path].pop(0)
+
+        parts = path.strip("/").split("/")
+        if parts == ["groups"]:
+            page = int(request.url.params.get("page", 0))
+            count = int(request.url.params.get("count", 0) or 100)
+            names = sorted(self.groups)[page * count:(page + 1) * count]
+            return httpx.Response(200, json={"groups": [{"cn": cn} for cn in names]})
+        if parts[0] == "groups" and len(parts) >= 2:
+            group = self.groups.get(parts[1])
+            if group is None:
+                return httpx.Response(404, text="group not found")
+            if parts[2:] == ["owners"]:
+                return httpx.Response(200, json={"owners": [{"uid": uid} for uid in group["owners"]]})
+            etag = f'"{group["etag"]}"'
+            if request.headers.get("If-None-Match") == etag:
+                return httpx.Response(304, headers={"ETag": etag})
+            return httpx.Response(
+                200,
+                json={
+                    "cn": parts[1],
+                    "owners": [{"id": uid, "type": "user"} for uid in group["owners"]],
+                    "members": [{"id": uid, "type": "user"} for uid in group["members"]],
+                },
+                headers={"ETag": etag},
+            )
+        return httpx.Response(404, text="not found")
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """Give every test empty caches and closed circuit breakers."""
+    mcp_server.clear_response_cache()
+    mcp_server.MEMBERSHIP_INDEX.clear()
+    mcp_server._inflight_requests.clear()
+    monkeypatch.setattr(mcp_server, "_rover_breaker", mcp_server.CircuitBreaker("rover", 5, 30))
+    monkeypatch.setattr(mcp_server, "_jira_breaker", mcp_server.CircuitBreaker("jira", 5, 30))
+    mcp_server.set_jira_backend(None)
+    yield
+    mcp_server.set_jira_backend(None)
+
+
+@pytest.fixture
+def api(monkeypatch) -> FakeGroupsAPI:
+    """Route the server's HTTP client to a FakeGroupsAPI."""
+    fake = FakeGroupsAPI()
+    monkeypatch.setattr(
+        mcp_server, "_new_http_client", lambda context: httpx.AsyncClient(transport=httpx.MockTransport(fake.handle))
+    )
+    return fake
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine on a fresh event loop, closing the shared HTTP client afterwards."""
+    def run_coroutine(coroutine):
+        async def main():
+            try:
+                return await coroutine
+            finally:
+                await mcp_server.close_http_client()
+        return asyncio.run(main())
+    return run_coroutine
+
+
+def in_scope(coroutine, deadline: float = 0, retry_budget: int = 20):
+    """Await `coroutine` inside a fresh tool scope, returning the result and the scope."""
+    async def scoped():
+        scope = mcp_server.ToolScope(retry_budget, deadline)
+        mcp_server._tool_scope.set(scope)
+        try:
+            return await coroutine, scope
+        except Exception as e:
+            return e, scope
+    return scoped()
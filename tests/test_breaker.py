@@ -0,0 +1,75 @@
+"""Circuit breakers around the groups API and JIRA backends."""
+import time
+
+import httpx
+import pytest
+
+import mcp_server
+from conftest import in_scope
+
+GROUP_URL = f"{mcp_server.API_BASE_URL}/groups/sp-one"
+
+
+def expire(url: str) -> None:
+    mcp_server._response_cache[mcp_server._cache_key(url, None)]["expires"] = 0
+
+
+def test_breaker_opens_fails_fast_and_closes_after_a_probe():
+    breaker = mcp_server.CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure("boom")
+    assert breaker.state == "closed"
+    breaker.record_failure("boom")
+    assert breaker.state == "open"
+    with pytest.raises(mcp_server.CircuitOpenError):
+        breaker.check()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.times_opened == 1
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = mcp_server.CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure("boom")
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure("still down")
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.times_opened == 2
+
+
+def test_open_breaker_serves_stale_copies_and_fails_fast_otherwise(api, run):
+    api.add_group("sp-one")
+    api.add_group("sp-two")
+
+    async def scenario():
+        await mcp_server.rover_group("sp-one")
+        expire(GROUP_URL)
+        for _ in range(mcp_server._rover_breaker.failure_threshold):
+            mcp_server._rover_breaker.record_failure("boom")
+        return await in_scope(mcp_server.rover_group("sp-one")), await mcp_server.rover_group("sp-two")
+
+    (stale, scope), missing = run(scenario())
+    assert stale["cn"] == "sp-one"
+    assert scope.stale_responses == 1
+    assert "circuit open" in missing["error"]
+    assert len(api.requests) == 1
+
+
+def test_server_errors_open_the_breaker(api, run, monkeypatch):
+    monkeypatch.setattr(mcp_server, "RETRY_MAX_ATTEMPTS", 1)
+    api.fail("/groups/sp-one", *(httpx.Response(500) for _ in range(5)))
+
+    async def scenario():
+        return [await mcp_server.rover_group("sp-one") for _ in range(6)]
+
+    results = run(scenario())
+    assert mcp_server._rover_breaker.state == "open"
+    assert "circuit open" in results[-1]["error"]
+    assert api.count("/groups/sp-one") == 5
@@ -0,0 +1,46 @@
+"""Response cache: TTL expiry, negative caching and LRU eviction."""
+import mcp_server
+
+GROUP_URL = f"{mcp_server.API_BASE_URL}/groups/sp-one"
+
+
+def expire(url: str) -> None:
+    mcp_server._response_cache[mcp_server._cache_key(url, None)]["expires"] = 0
+
+
+def test_cached_group_is_served_until_it_expires(api, run):
+    api.add_group("sp-one", owners=["alice"])
+
+    async def scenario():
+        first = await mcp_server.rover_group("sp-one")
+        second = await mcp_server.rover_group("sp-one")
+        expire(GROUP_URL)
+        await mcp_server.rover_group("sp-one")
+        return first, second
+
+    first, second = run(scenario())
+    assert first is second
+    assert api.count("/groups/sp-one") == 2
+
+
+def test_missing_group_is_cached_as_not_found(api, run):
+    async def scenario():
+        return [await mcp_server.rover_group("sp-missing") for _ in range(2)]
+
+    results = run(scenario())
+    assert all("not found" in result["error"] for result in results)
+    assert api.count("/groups/sp-missing") == 1
+
+
+def test_least_recently_used_entry_is_evicted(api, run, monkeypatch):
+    monkeypatch.setattr(mcp_server, "CACHE_MAX_ENTRIES", 2)
+    for cn in ("sp-a", "sp-b", "sp-c"):
+        api.add_group(cn)
+
+    async def scenario():
+        for cn in ("sp-a", "sp-b", "sp-a", "sp-c", "sp-a", "sp-b"):
+            await mcp_server.rover_group(cn)
+
+    run(scenario())
+    # sp-b was least recently used when sp-c arrived
+    assert (api.count("/groups/sp-a"), api.count("/groups/sp-b"), api.count("/groups/sp-c")) == (1, 2, 1)
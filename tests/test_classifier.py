@@ -0,0 +1,23 @@
+"""Keyword classification of issue summaries into focus areas."""
+import mcp_server
+
+
+def test_focus_keywords_match_whole_words_unless_marked_as_prefixes():
+    classifier = mcp_server.KeywordClassifier([("ci", ["ci"]), ("deploy", ["push*"])])
+
+    assert classifier.histogram("move to another city", {}) == {}
+    assert classifier.histogram("fix ci flake", {}) == {0: 1}
+    assert classifier.histogram("pushing the release", {}) == {1: 1}
+
+
+def test_shorter_keywords_are_credited_inside_longer_matches():
+    classifier = mcp_server.KeywordClassifier([("ci", ["ci"]), ("pipeline", ["ci cd"])])
+
+    assert classifier.histogram("set up ci cd", {}) == {0: 1, 1: 1}
+
+
+def test_earlier_rules_win_ties():
+    classifier = mcp_server.KeywordClassifier([("first", ["bug"]), ("second", ["fix"])])
+
+    assert classifier.best_label(classifier.histogram("fix bug", {}), "none") == "first"
+    assert classifier.best_label({}, "none") == "none"
@@ -0,0 +1,43 @@
+"""Single-flight coalescing of concurrent identical requests."""
+import asyncio
+
+import httpx
+
+import mcp_server
+
+
+def test_concurrent_identical_requests_share_one_upstream_call(api, run):
+    api.add_group("sp-one")
+    api.delay = 0.05
+
+    async def scenario():
+        return await asyncio.gather(*(mcp_server.rover_group("sp-one") for _ in range(5)))
+
+    results = run(scenario())
+    assert all(result["cn"] == "sp-one" for result in results)
+    assert api.count("/groups/sp-one") == 1
+
+
+def test_different_requests_are_not_coalesced(api, run):
+    api.add_group("sp-one")
+    api.add_group("sp-two")
+    api.delay = 0.05
+
+    async def scenario():
+        return await asyncio.gather(mcp_server.rover_group("sp-one"), mcp_server.rover_group("sp-two"))
+
+    run(scenario())
+    assert (api.count("/groups/sp-one"), api.count("/groups/sp-two")) == (1, 1)
+
+
+def test_coalesced_callers_share_a_failure(api, run, monkeypatch):
+    monkeypatch.setattr(mcp_server, "RETRY_MAX_ATTEMPTS", 1)
+    api.delay = 0.05
+    api.fail("/groups/sp-one", httpx.Response(500))
+
+    async def scenario():
+        return await asyncio.gather(*(mcp_server.rover_group("sp-one") for _ in range(3)))
+
+    results = run(scenario())
+    assert all("error" in result for result in results)
+    assert api.count("/groups/sp-one") == 1
@@ -0,0 +1,65 @@
+"""Per-tool deadlines and their propagation to shared and per-item work."""
+import asyncio
+
+import mcp_server
+from conftest import in_scope
+
+GROUP_URL = f"{mcp_server.API_BASE_URL}/groups/sp-one"
+
+
+def test_deadline_cuts_off_a_slow_request(api, run):
+    api.add_group("sp-one")
+    api.delay = 0.5
+
+    result, scope = run(in_scope(mcp_server.rover_group("sp-one"), deadline=0.1))
+    assert "deadline" in result["error"]
+    assert scope.deadline_hits == 1
+
+
+def test_coalesced_callers_keep_their_own_deadlines(api, run):
+    api.add_group("sp-one")
+    api.delay = 0.3
+
+    async def scenario():
+        async def waiter():
+            await asyncio.sleep(0.02)
+            return await in_scope(mcp_server.make_authenticated_request(GROUP_URL, cache_ttl=60), deadline=10)
+
+        return await asyncio.gather(
+            in_scope(mcp_server.make_authenticated_request(GROUP_URL, cache_ttl=60), deadline=0.1),
+            waiter(),
+        )
+
+    (first, first_scope), (second, second_scope) = run(scenario())
+    assert isinstance(first, mcp_server.DeadlineExceeded)
+    assert first_scope.deadline_hits == 1
+    assert second["cn"] == "sp-one"
+    assert second_scope.deadline_hits == 0
+    assert api.count("/groups/sp-one") == 1
+
+
+def test_per_item_timeout_is_not_a_deadline_hit(run):
+    async def slow(item):
+        await asyncio.sleep(1)
+
+    results, scope = run(in_scope(mcp_server.run_bounded([1, 2], slow, timeout=0.05), deadline=10))
+    assert all(isinstance(result, TimeoutError) for result in results)
+    assert not any(isinstance(result, mcp_server.DeadlineExceeded) for result in results)
+    assert scope.deadline_hits == 0
+
+
+def test_group_walking_tools_list_groups_the_deadline_cut_off(api, run):
+    api.add_group("sp-fast", owners=["alice"])
+    api.add_group("sp-slow", owners=["bob"])
+    api.delays["/groups/sp-slow/owners"] = 1
+
+    async def scenario():
+        usage, _ = await in_scope(mcp_server.find_company_group_usage_patterns(max_groups=0), deadline=0.2)
+        unused, _ = await in_scope(mcp_server.find_unused_accounts_and_teams(max_groups=0), deadline=0.2)
+        return usage, unused
+
+    usage, unused = run(scenario())
+    for analysis in (usage, unused):
+        assert [group["name"] for group in analysis["failed_groups"]] == ["sp-slow"]
+    assert usage["total_groups_found"] == unused["activity_statistics"]["total_groups_analyzed"] == 2
+    assert unused["activity_statistics"]["failed_groups_count"] == 1
@@ -0,0 +1,24 @@
+"""Group-walking analytical tools and the paginated listing."""
+import mcp_server
+
+
+def add_groups(api, count: int) -> None:
+    for n in range(count):
+        api.add_group(f"sp-{n:03d}", owners=["alice"], members=["bob"])
+
+
+def test_usage_patterns_stop_at_the_default_cap(api, run, monkeypatch):
+    monkeypatch.setattr(mcp_server, "ANALYSIS_MAX_GROUPS", 3)
+    add_groups(api, 5)
+
+    analysis = run(mcp_server.find_company_group_usage_patterns())
+    assert analysis["total_groups_found"] == 3
+    assert sum(api.count(f"/groups/sp-{n:03d}/owners") for n in range(5)) == 3
+
+
+def test_max_groups_zero_walks_every_group(api, run, monkeypatch):
+    monkeypatch.setattr(mcp_server, "ANALYSIS_MAX_GROUPS", 3)
+    add_groups(api, 5)
+
+    analysis = run(mcp_server.find_company_group_usage_patterns(max_groups=0))
+    assert analysis["total_groups_found"] == 5
@@ -0,0 +1,131 @@
+"""Batched JIRA searches: per-member failure isolation, retries and breaker accounting."""
+import asyncio
+import time
+
+import httpx
+
+import mcp_server
+
+
+class ScriptedJiraBackend(mcp_server.JiraBackend):
+    """Returns one issue per member, except for members set up to fail or stall."""
+
+    name = "scripted"
+
+    def __init__(self, failing=(), slow=()):
+        self.failing = set(failing)
+        self.slow = set(slow)
+
+    async def search(self, member_id, limit=mcp_server.JIRA_SEARCH_LIMIT):
+        if member_id in self.failing:
+            raise RuntimeError(f"search failed for {member_id}")
+        if member_id in self.slow:
+            await asyncio.sleep(5)
+        return [{"key": f"PROJ-{member_id}", "project": "PROJ", "summary": "Fix the deploy pipeline"}]
+
+
+def test_batch_search_keeps_each_members_failure_to_itself(run):
+    backend = ScriptedJiraBackend(failing=["bad"])
+
+    results = run(backend.search_batch(["alice", "bad", "carol"]))
+    assert len(results["alice"]) == len(results["carol"]) == 1
+    assert isinstance(results["bad"], RuntimeError)
+
+
+def test_only_failed_members_are_marked_unavailable(run):
+    mcp_server.set_jira_backend(ScriptedJiraBackend(failing=["bad"]))
+
+    activity = run(mcp_server.analyze_members_jira_activity(["alice", "bad"]))
+    assert "error" not in activity["alice"]
+    assert activity["alice"]["total_issues"] == 1
+    assert "search failed for bad" in activity["bad"]["error"]
+    assert mcp_server._jira_breaker.state == "closed"
+
+
+def test_chunk_where_every_member_failed_counts_against_the_breaker(run):
+    mcp_server.set_jira_backend(ScriptedJiraBackend(failing=["bad"]))
+
+    async def scenario():
+        for _ in range(mcp_server._jira_breaker.failure_threshold):
+            await mcp_server.call_jira_search_batch(["bad"])
+        return await mcp_server.call_jira_search_batch(["alice"])
+
+    result = run(scenario())
+    assert mcp_server._jira_breaker.state == "open"
+    assert "circuit open" in result["errors"]["alice"]
+
+
+def test_slow_owner_fails_alone_in_a_correlation(api, run, monkeypatch):
+    monkeypatch.setattr(mcp_server, "MEMBER_ANALYSIS_TIMEOUT", 0.1)
+    api.add_group("sp-one", owners=["alice", "slow", "carol"])
+    mcp_server.set_jira_backend(ScriptedJiraBackend(slow=["slow"]))
+
+    correlation = run(mcp_server.correlate_rover_groups_with_jira("sp-one"))
+    jira = correlation["jira_correlation"]
+    assert sorted(jira["owners_jira_activity"]) == ["alice", "carol"]
+    assert [owner["uid"] for owner in jira["failed_owners"]] == ["slow"]
+
+
+def test_http_batch_search_is_retried(run):
+    attempts = []
+
+    def handle(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"results": {"alice": [{"key": "PROJ-1"}]}})
+
+    backend = mcp_server.HttpJiraBackend("http://jira.test")
+    backend._client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+
+    async def scenario():
+        try:
+            return await backend.search_batch(["alice", "bob"])
+        finally:
+            await backend.close()
+
+    results = run(scenario())
+    assert results == {"alice": [{"key": "PROJ-1"}], "bob": []}
+    assert [request.method for request in attempts] == ["POST", "POST"]
+
+
+def test_chunks_are_searched_concurrently(run, monkeypatch):
+    monkeypatch.setattr(mcp_server, "JIRA_BATCH_SIZE", 2)
+
+    class SlowBatchBackend(mcp_server.JiraBackend):
+        name = "slow-batch"
+        calls = 0
+
+        async def search_batch(self, member_ids, limit=mcp_server.JIRA_SEARCH_LIMIT, timeout=None):
+            type(self).calls += 1
+            await asyncio.sleep(0.2)
+            return {uid: [] for uid in member_ids}
+
+    mcp_server.set_jira_backend(SlowBatchBackend())
+
+    started = time.monotonic()
+    result = run(mcp_server.call_jira_search_batch([f"u{i}" for i in range(8)]))
+    assert len(result["results"]) == 8
+    assert SlowBatchBackend.calls == 4
+    assert time.monotonic() - started < 0.6
+
+
+def test_fixture_batch_returns_each_members_newest_issues(run, tmp_path):
+    issues = [
+        {"key": f"PROJ-{n}", "project": "PROJ", "updated": f"2024-01-{n:02d}", "assignee": "alice", "reporter": "bob"}
+        for n in range(1, 6)
+    ]
+    path = str(tmp_path / "jira.db")
+    mcp_server.write_jira_fixture(path, issues)
+    backend = mcp_server.FixtureJiraBackend(path)
+
+    async def scenario():
+        try:
+            return await backend.search_batch(["alice", "bob", "carol", "alice"], limit=2)
+        finally:
+            await backend.close()
+
+    results = run(scenario())
+    assert [issue["key"] for issue in results["alice"]] == ["PROJ-5", "PROJ-4"]
+    assert [issue["key"] for issue in results["bob"]] == ["PROJ-5", "PROJ-4"]
+    assert results["carol"] == []
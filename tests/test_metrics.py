@@ -0,0 +1,21 @@
+"""Per-tool fan-out accounting and the metrics registry."""
+import asyncio
+
+import mcp_server
+from conftest import in_scope
+
+
+def test_fan_out_counts_only_real_sends_as_upstream(api, run):
+    api.add_group("sp-one")
+    api.delay = 0.05
+
+    async def scenario():
+        await asyncio.gather(*(mcp_server.rover_group("sp-one") for _ in range(3)))
+        await mcp_server.rover_group("sp-one")
+        for _ in range(mcp_server._rover_breaker.failure_threshold):
+            mcp_server._rover_breaker.record_failure("boom")
+        await mcp_server.rover_group("sp-two")
+
+    _, scope = run(in_scope(scenario()))
+    assert dict(scope.requests_by_source) == {"upstream": 1, "coalesced": 2, "cache": 1, "error": 1}
+    assert api.count("/groups/sp-one") == 1
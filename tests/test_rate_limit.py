@@ -0,0 +1,61 @@
+"""Client-side token bucket for the groups API."""
+import asyncio
+import time
+
+import mcp_server
+
+
+def test_token_bucket_spaces_requests_beyond_the_burst(run):
+    bucket = mcp_server.TokenBucket("test", rate=20, burst=1)
+
+    async def scenario():
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    assert run(scenario()) >= 0.09
+    assert bucket.stats()["acquired"] == 3
+
+
+def test_throttled_response_lowers_the_rate():
+    bucket = mcp_server.TokenBucket("test", rate=20, burst=1)
+    bucket.on_throttled()
+    assert bucket.rate == 20 * mcp_server.RATE_LIMIT_DECREASE
+    assert bucket.throttled == 1
+
+
+def test_cancelled_waiter_gives_its_slot_back(run):
+    bucket = mcp_server.TokenBucket("test", rate=1, burst=1)
+
+    async def scenario():
+        await bucket.acquire()
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0.01)
+        depth = bucket.queue_depth
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        return depth
+
+    assert run(scenario()) == 1
+    assert bucket.queue_depth == 0
+    assert bucket.tokens > -1
+
+
+def test_waiters_and_wait_time_are_exported_as_metrics(run):
+    bucket = mcp_server.TokenBucket("metrics-test", rate=20, burst=1)
+
+    async def scenario():
+        await bucket.acquire()
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0.01)
+        waiting = mcp_server.METRICS.render()
+        await waiter
+        return waiting
+
+    waiting = run(scenario())
+    assert 'rover_rate_limit_waiters{bucket="metrics-test"} 1' in waiting
+    rendered = mcp_server.METRICS.render()
+    assert 'rover_rate_limit_waiters{bucket="metrics-test"} 0' in rendered
+    assert 'rover_rate_limit_wait_seconds_count{bucket="metrics-test"} 2' in rendered
+    assert 'rover_rate_limit_current_rps{bucket="metrics-test"} 20' in rendered
@@ -0,0 +1,50 @@
+"""Retries with backoff, Retry-After and the per-tool retry budget."""
+import time
+
+import httpx
+
+import mcp_server
+from conftest import in_scope
+
+GROUP_URL = f"{mcp_server.API_BASE_URL}/groups/sp-one"
+
+
+def test_transient_failures_are_retried_and_charged_to_the_tool(api, run):
+    api.add_group("sp-one")
+    api.fail("/groups/sp-one", httpx.Response(503), httpx.Response(502))
+
+    group, scope = run(in_scope(mcp_server.make_authenticated_request(GROUP_URL, cache_ttl=60)))
+    assert group["cn"] == "sp-one"
+    assert scope.retries == 2
+    assert dict(scope.retries_by_reason) == {"503": 1, "502": 1}
+
+
+def test_retry_waits_at_least_as_long_as_retry_after(api, run):
+    api.add_group("sp-one")
+    api.fail("/groups/sp-one", httpx.Response(429, headers={"Retry-After": "0.2"}))
+
+    started = time.monotonic()
+    group, _ = run(in_scope(mcp_server.make_authenticated_request(GROUP_URL, cache_ttl=60)))
+    assert group["cn"] == "sp-one"
+    assert time.monotonic() - started >= 0.2
+
+
+def test_exhausted_retry_budget_returns_the_failure(api, run):
+    api.add_group("sp-one")
+    api.fail("/groups/sp-one", *(httpx.Response(503) for _ in range(5)))
+
+    error, scope = run(in_scope(mcp_server.make_authenticated_request(GROUP_URL, cache_ttl=60), retry_budget=1))
+    assert isinstance(error, httpx.HTTPStatusError)
+    assert error.response.status_code == 503
+    assert api.count("/groups/sp-one") == 2
+    assert scope.retries == 1
+    assert scope.retries_exhausted == 1
+
+
+def test_client_errors_are_not_retried(api, run):
+    api.fail("/groups/sp-one", httpx.Response(400))
+
+    error, scope = run(in_scope(mcp_server.make_authenticated_request(GROUP_URL, cache_ttl=60)))
+    assert isinstance(error, httpx.HTTPStatusError)
+    assert api.count("/groups/sp-one") == 1
+    assert scope.retries == 0
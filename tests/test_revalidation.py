@@ -0,0 +1,35 @@
+"""Conditional GETs revalidating expired group payloads."""
+import mcp_server
+
+GROUP_URL = f"{mcp_server.API_BASE_URL}/groups/sp-one"
+
+
+def expire(url: str) -> None:
+    mcp_server._response_cache[mcp_server._cache_key(url, None)]["expires"] = 0
+
+
+def test_unchanged_group_is_revalidated_with_its_etag(api, run):
+    api.add_group("sp-one", owners=["alice"])
+
+    async def scenario():
+        first = await mcp_server.rover_group("sp-one")
+        expire(GROUP_URL)
+        return first, await mcp_server.rover_group("sp-one")
+
+    first, second = run(scenario())
+    assert first is second
+    assert api.count("/groups/sp-one") == 2
+    assert api.requests[-1].headers["If-None-Match"] == '"v1"'
+
+
+def test_changed_group_replaces_the_expired_copy(api, run):
+    api.add_group("sp-one", owners=["alice"])
+
+    async def scenario():
+        await mcp_server.rover_group("sp-one")
+        api.add_group("sp-one", owners=["bob"], etag="v2")
+        expire(GROUP_URL)
+        return await mcp_server.rover_group("sp-one")
+
+    group = run(scenario())
+    assert [owner["id"] for owner in group["owners"]] == ["bob"]
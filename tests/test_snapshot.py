@@ -0,0 +1,54 @@
+"""Group snapshot syncing and freshness."""
+import httpx
+
+import mcp_server
+
+
+def test_failed_pass_records_the_attempt_but_keeps_the_snapshot_stale(api, run, tmp_path):
+    api.add_group("sp-one", owners=["alice"])
+    api.add_group("sp-two", owners=["bob"])
+    api.fail("/groups/sp-two", *(httpx.Response(500) for _ in range(mcp_server.RETRY_MAX_ATTEMPTS)))
+    store = mcp_server.SnapshotStore(str(tmp_path / "snapshot.db"))
+
+    async def scenario():
+        first = await mcp_server.sync_group_snapshot(store)
+        return first, await store.staleness(), await store.last_attempt()
+
+    stats, staleness, last_attempt = run(scenario())
+    assert (stats["updated"], stats["failed"]) == (1, 1)
+    assert staleness["synced_at"] is None
+    assert staleness["stale"]
+    assert last_attempt is not None
+
+
+def test_clean_pass_advances_last_sync(api, run, tmp_path):
+    api.add_group("sp-one", owners=["alice"])
+    store = mcp_server.SnapshotStore(str(tmp_path / "snapshot.db"))
+
+    async def scenario():
+        await mcp_server.sync_group_snapshot(store)
+        # The second pass revalidates with the stored ETag
+        second = await mcp_server.sync_group_snapshot(store)
+        return second, await store.staleness()
+
+    stats, staleness = run(scenario())
+    assert stats["unchanged"] == 1
+    assert not staleness["stale"]
+    assert mcp_server.MEMBERSHIP_INDEX.groups_for("alice")
+
+
+def test_groups_missing_from_a_clean_listing_are_pruned(api, run, tmp_path):
+    api.add_group("sp-one", owners=["alice"])
+    api.add_group("sp-two", owners=["bob"])
+    store = mcp_server.SnapshotStore(str(tmp_path / "snapshot.db"))
+
+    async def scenario():
+        await mcp_server.sync_group_snapshot(store)
+        del api.groups["sp-two"]
+        stats = await mcp_server.sync_group_snapshot(store)
+        return stats, await store.user_groups("bob")
+
+    stats, bob_groups = run(scenario())
+    assert stats["removed"] == 1
+    assert bob_groups == []
+    assert not mcp_server.MEMBERSHIP_INDEX.groups_for("bob")